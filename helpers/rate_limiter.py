@@ -6,18 +6,71 @@ Prevents API quota exhaustion and service disruption
 
 import time
 import logging
-from typing import Dict, Optional, Callable
-from datetime import datetime, timedelta
-from collections import deque
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Callable, Iterable
 from threading import Lock
 
 _logger = logging.getLogger(__name__)
 
+# Notification channels with a dedicated rate limiter, in storage order
+CHANNELS = ('sms', 'whatsapp', 'email', 'push')
+_CHANNEL_IDX = {channel: idx for idx, channel in enumerate(CHANNELS)}
+
+
+class _TokenBucket:
+    """
+    Minimal token bucket holding only floats
+
+    Kept free of locking and clock reads so the arithmetic stays a handful
+    of slot loads; callers pass the current monotonic time in.
+    """
+
+    __slots__ = ('tokens', 'last_refill', 'rate', 'burst')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = now
+
+    def refill(self, now: float) -> float:
+        """Add tokens accrued since the last refill and return the balance"""
+        elapsed = now - self.last_refill
+        if elapsed <= 0:
+            # Stale clock reading shared by a batch caller
+            return self.tokens
+        tokens = self.tokens + elapsed * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self.tokens = tokens
+        self.last_refill = now
+        return tokens
+
+    def try_acquire(self, now: float) -> bool:
+        """Take one token if available"""
+        if self.refill(now) >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token becomes available"""
+        missing = 1.0 - self.refill(now)
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate
+
 
 class RateLimiter:
     """
     Token bucket rate limiter for API calls
     Thread-safe implementation
+
+    max_requests / time_window is the sustained rate, not a hard cap per
+    window: the bucket starts full and holds up to burst_size tokens, so
+    any span of time_window seconds allows up to burst_size + max_requests
+    requests (2 x max_requests with the default burst) after an idle period.
+    Pass a smaller burst_size to tighten that bound.
     """
 
     def __init__(
@@ -32,12 +85,26 @@ class RateLimiter:
         Args:
             max_requests: Maximum requests allowed per time window
             time_window: Time window in seconds
-            burst_size: Maximum burst size (defaults to max_requests)
+            burst_size: Requests allowed at once after an idle period, on
+                top of the sustained rate (defaults to max_requests)
+
+        Raises:
+            ValueError: If max_requests, time_window or burst_size is not positive
         """
+        if max_requests <= 0:
+            raise ValueError('max_requests must be positive, got %r' % (max_requests,))
+        if time_window <= 0:
+            raise ValueError('time_window must be positive, got %r' % (time_window,))
+        if burst_size is not None and burst_size < 1:
+            raise ValueError('burst_size must be at least 1, got %r' % (burst_size,))
         self.max_requests = max_requests
         self.time_window = time_window
         self.burst_size = burst_size or max_requests
-        self.requests = deque()
+        self._bucket = _TokenBucket(
+            rate=max_requests / time_window,
+            burst=float(self.burst_size),
+            now=time.monotonic()
+        )
         self.lock = Lock()
 
     def is_allowed(self) -> bool:
@@ -48,19 +115,33 @@ class RateLimiter:
             bool: True if request is allowed, False otherwise
         """
         with self.lock:
-            now = time.time()
-            cutoff = now - self.time_window
+            return self._bucket.try_acquire(time.monotonic())
 
-            # Remove old requests outside time window
-            while self.requests and self.requests[0] < cutoff:
-                self.requests.popleft()
+    def try_acquire(self, now: float) -> bool:
+        """
+        Like is_allowed, but using a caller-supplied clock reading
+
+        Args:
+            now: Current time from time.monotonic()
+
+        Returns:
+            bool: True if request is allowed, False otherwise
+        """
+        with self.lock:
+            return self._bucket.try_acquire(now)
 
-            # Check if under limit
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
-                return True
+    def time_until_available(self, now: float) -> float:
+        """
+        Seconds until the next request would be allowed
 
-            return False
+        Args:
+            now: Current time from time.monotonic()
+
+        Returns:
+            float: Wait time in seconds (0 if a request is allowed now)
+        """
+        with self.lock:
+            return self._bucket.wait_time(now)
 
     def wait_if_needed(self, timeout: Optional[float] = None) -> bool:
         """
@@ -72,63 +153,65 @@ class RateLimiter:
         Returns:
             bool: True if request is now allowed, False if timeout reached
         """
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
+        timeout_ns = int(timeout * 1e9) if timeout else 0
 
         while not self.is_allowed():
-            if timeout and (time.time() - start_time) >= timeout:
+            if timeout_ns and time.monotonic_ns() - start_ns >= timeout_ns:
                 return False
 
-            # Calculate wait time until next slot is available
+            # Calculate wait time until next token is available
             with self.lock:
-                if self.requests:
-                    oldest = self.requests[0]
-                    wait_time = (oldest + self.time_window) - time.time()
-                    if wait_time > 0:
-                        time.sleep(min(wait_time, 1.0))
-                else:
-                    time.sleep(0.1)
+                wait_time = self._bucket.wait_time(time.monotonic())
+            if wait_time > 0:
+                time.sleep(min(wait_time, 1.0))
 
         return True
 
     def get_remaining_requests(self) -> int:
         """
-        Get number of remaining requests in current window
+        Get number of requests that would be allowed right now
 
         Returns:
-            int: Number of remaining requests
+            int: Whole tokens in the bucket; a partially refilled token
+                 does not count until it completes
         """
         with self.lock:
-            now = time.time()
-            cutoff = now - self.time_window
-
-            # Remove old requests
-            while self.requests and self.requests[0] < cutoff:
-                self.requests.popleft()
-
-            return max(0, self.max_requests - len(self.requests))
+            return int(self._bucket.refill(time.monotonic()))
 
     def reset(self):
-        """Reset rate limiter (clear all tracked requests)"""
+        """Reset rate limiter (refill the bucket)"""
         with self.lock:
-            self.requests.clear()
+            self._bucket.tokens = self._bucket.burst
+            self._bucket.last_refill = time.monotonic()
 
 
 class NotificationRateLimiter:
     """
     Rate limiter specifically for notification sending
     Manages limits per channel (SMS, WhatsApp, Email, Push)
+
+    The per-minute limits are sustained rates; see RateLimiter for the
+    burst allowed after an idle period.
     """
 
     def __init__(self):
         """Initialize notification rate limiter with default limits"""
-        self.limiters = {
-            'sms': RateLimiter(max_requests=100, time_window=60),  # 100 SMS per minute
-            'whatsapp': RateLimiter(max_requests=80, time_window=60),  # 80 WhatsApp per minute
-            'email': RateLimiter(max_requests=200, time_window=60),  # 200 emails per minute
-            'push': RateLimiter(max_requests=500, time_window=60),  # 500 push per minute
-        }
+        # Limiters are stored positionally (see _CHANNEL_IDX) so the hot
+        # is_allowed path is a list index instead of a dict lookup
+        self._limiters = [
+            RateLimiter(max_requests=100, time_window=60),  # 100 SMS per minute
+            RateLimiter(max_requests=80, time_window=60),  # 80 WhatsApp per minute
+            RateLimiter(max_requests=200, time_window=60),  # 200 emails per minute
+            RateLimiter(max_requests=500, time_window=60),  # 500 push per minute
+        ]
         self.lock = Lock()
 
+    @property
+    def limiters(self) -> Mapping[str, RateLimiter]:
+        """Read-only mapping of channel name to its RateLimiter (see configure_limit)"""
+        return MappingProxyType(dict(zip(CHANNELS, self._limiters)))
+
     def configure_limit(self, channel: str, max_requests: int, time_window: int):
         """
         Configure rate limit for a specific channel
@@ -137,12 +220,20 @@ class NotificationRateLimiter:
             channel: Notification channel (sms, whatsapp, email, push)
             max_requests: Maximum requests per time window
             time_window: Time window in seconds
+
+        Raises:
+            ValueError: If channel is not one of CHANNELS, or max_requests
+                or time_window is not positive
         """
+        idx = _CHANNEL_IDX.get(channel)
+        if idx is None:
+            raise ValueError('Unknown notification channel: %s' % channel)
+
         with self.lock:
-            self.limiters[channel] = RateLimiter(max_requests, time_window)
+            self._limiters[idx] = RateLimiter(max_requests, time_window)
             _logger.info(
-                f'Configured rate limit for {channel}: '
-                f'{max_requests} requests per {time_window}s'
+                'Configured rate limit for %s: %d requests per %ss',
+                channel, max_requests, time_window
             )
 
     def is_allowed(self, channel: str) -> bool:
@@ -155,12 +246,12 @@ class NotificationRateLimiter:
         Returns:
             bool: True if allowed, False otherwise
         """
-        limiter = self.limiters.get(channel)
-        if not limiter:
-            _logger.warning(f'No rate limiter configured for channel: {channel}')
+        idx = _CHANNEL_IDX.get(channel)
+        if idx is None:
+            _logger.warning('No rate limiter configured for channel: %s', channel)
             return True  # Allow if no limiter configured
 
-        return limiter.is_allowed()
+        return self._limiters[idx].is_allowed()
 
     def wait_and_send(
         self,
@@ -179,21 +270,73 @@ class NotificationRateLimiter:
         Returns:
             bool: True if sent successfully, False if timeout
         """
-        limiter = self.limiters.get(channel)
-        if not limiter:
-            _logger.warning(f'No rate limiter configured for channel: {channel}')
+        idx = _CHANNEL_IDX.get(channel)
+        if idx is None:
+            _logger.warning('No rate limiter configured for channel: %s', channel)
             send_func()
             return True
 
-        if limiter.wait_if_needed(timeout=timeout):
+        if self._limiters[idx].wait_if_needed(timeout=timeout):
             send_func()
             return True
 
         _logger.warning(
-            f'Rate limit timeout for channel {channel} after {timeout}s'
+            'Rate limit timeout for channel %s after %ss', channel, timeout
         )
         return False
 
+    def wait_and_send_batch(
+        self,
+        channel: str,
+        send_funcs: Iterable[Callable],
+        timeout_total: Optional[float] = 30.0
+    ) -> int:
+        """
+        Wait for rate limit and execute several send functions in order
+
+        The clock is read once up front and only re-read after sleeping,
+        instead of several times per notification.
+
+        Args:
+            channel: Notification channel
+            send_funcs: Functions to execute, one per notification
+            timeout_total: Maximum total wait time in seconds for the batch
+
+        Returns:
+            int: Number of send functions executed (less than the batch
+                 size if the timeout was reached)
+        """
+        idx = _CHANNEL_IDX.get(channel)
+        if idx is None:
+            _logger.warning('No rate limiter configured for channel: %s', channel)
+            sent = 0
+            for send_func in send_funcs:
+                send_func()
+                sent += 1
+            return sent
+
+        limiter = self._limiters[idx]
+        now = time.monotonic()
+        deadline = now + timeout_total if timeout_total else None
+        sent = 0
+
+        for send_func in send_funcs:
+            while not limiter.try_acquire(now):
+                wait_time = limiter.time_until_available(now)
+                if deadline is not None and now + wait_time > deadline:
+                    _logger.warning(
+                        'Rate limit timeout for channel %s after %ss (%d sent)',
+                        channel, timeout_total, sent
+                    )
+                    return sent
+                time.sleep(wait_time)
+                now = time.monotonic()
+
+            send_func()
+            sent += 1
+
+        return sent
+
     def get_stats(self, channel: Optional[str] = None) -> Dict:
         """
         Get rate limiting statistics
@@ -207,15 +350,16 @@ class NotificationRateLimiter:
         stats = {}
 
         if channel:
-            limiter = self.limiters.get(channel)
-            if limiter:
+            idx = _CHANNEL_IDX.get(channel)
+            if idx is not None:
+                limiter = self._limiters[idx]
                 stats[channel] = {
                     'max_requests': limiter.max_requests,
                     'time_window': limiter.time_window,
                     'remaining': limiter.get_remaining_requests(),
                 }
         else:
-            for ch, limiter in self.limiters.items():
+            for ch, limiter in zip(CHANNELS, self._limiters):
                 stats[ch] = {
                     'max_requests': limiter.max_requests,
                     'time_window': limiter.time_window,
@@ -306,8 +450,8 @@ class AdaptiveRateLimiter:
 
         if new_limit > self.current_max_requests:
             _logger.info(
-                f'Increasing rate limit from {self.current_max_requests} '
-                f'to {new_limit} requests per {self.time_window}s'
+                'Increasing rate limit from %d to %d requests per %ss',
+                self.current_max_requests, new_limit, self.time_window
             )
             self.current_max_requests = new_limit
             self.limiter = RateLimiter(new_limit, self.time_window)
@@ -319,8 +463,8 @@ class AdaptiveRateLimiter:
 
         if new_limit < self.current_max_requests:
             _logger.warning(
-                f'Reducing rate limit from {self.current_max_requests} '
-                f'to {new_limit} requests per {self.time_window}s'
+                'Reducing rate limit from %d to %d requests per %ss',
+                self.current_max_requests, new_limit, self.time_window
             )
             self.current_max_requests = new_limit
             self.limiter = RateLimiter(new_limit, self.time_window)
@@ -330,5 +474,19 @@ class AdaptiveRateLimiter:
         return self.limiter.is_allowed()
 
 
-# Global notification rate limiter instance
-notification_rate_limiter = NotificationRateLimiter()
+# Global notification rate limiter instance, built on first access (PEP 562)
+# so processes that import this module without sending notifications don't
+# pay for its limiters
+_notification_rate_limiter = None
+_notification_rate_limiter_lock = Lock()
+
+
+def __getattr__(name):
+    global _notification_rate_limiter
+    if name == 'notification_rate_limiter':
+        if _notification_rate_limiter is None:
+            with _notification_rate_limiter_lock:
+                if _notification_rate_limiter is None:
+                    _notification_rate_limiter = NotificationRateLimiter()
+        return _notification_rate_limiter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
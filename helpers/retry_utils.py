@@ -6,7 +6,7 @@ Retry utilities with exponential backoff for API calls and external integrations
 import time
 import random
 import logging
-from typing import Callable, Any, Optional, Type, Tuple
+from typing import Callable, Any, Optional, Type, Tuple, Union
 from functools import wraps
 
 _logger = logging.getLogger(__name__)
@@ -63,6 +63,29 @@ class RetryConfig:
         return max(0, delay)
 
 
+def _normalize_exceptions(
+    exceptions: Union[Type[BaseException], Tuple[Type[BaseException], ...]]
+) -> Tuple[Type[BaseException], ...]:
+    """
+    Deduplicate an exception tuple and drop entries already covered by a base
+
+    Keeps the caller's order, so the most common type should come first.
+
+    Args:
+        exceptions: Exception type or tuple of types, as passed to an except clause
+
+    Returns:
+        Tuple: Equivalent, possibly shorter tuple
+    """
+    if isinstance(exceptions, type):
+        exceptions = (exceptions,)
+    unique = tuple(dict.fromkeys(exceptions))
+    return tuple(
+        exc for exc in unique
+        if not any(other is not exc and issubclass(exc, other) for other in unique)
+    )
+
+
 def retry_with_backoff(
     max_retries: int = 3,
     retry_on: Tuple[Type[Exception], ...] = (Exception,),
@@ -75,7 +98,7 @@ def retry_with_backoff(
 
     Args:
         max_retries: Maximum number of retry attempts
-        retry_on: Tuple of exception types to retry on
+        retry_on: Tuple of exception types to retry on (most common first)
         ignore_on: Tuple of exception types to never retry (re-raise immediately)
         config: Custom RetryConfig instance
         log_attempts: Whether to log retry attempts
@@ -90,50 +113,132 @@ def retry_with_backoff(
     if config is None:
         config = RetryConfig(max_retries=max_retries)
 
+    retry_on = _normalize_exceptions(retry_on)
+    ignore_on = _normalize_exceptions(ignore_on)
+
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
+        name = func.__name__
+
+        def log_ignored(e):
+            if log_attempts:
+                _logger.warning(
+                    "Function %s raised non-retryable exception: %s",
+                    name, type(e).__name__
+                )
+
+        def log_failed(e, attempts):
+            if log_attempts:
+                _logger.error(
+                    "Function %s failed after %d attempts: %s", name, attempts, e
+                )
+
+        def wait_before_retry(e, attempt):
+            delay = config.get_delay(attempt)
+            if log_attempts:
+                _logger.warning(
+                    "Function %s attempt %d/%d failed: %s. Retrying in %.2fs...",
+                    name, attempt + 1, config.max_retries + 1, e, delay
+                )
+            time.sleep(delay)
 
-            for attempt in range(config.max_retries + 1):
+        # Specialize the common low-retry cases so the success path skips
+        # the attempt loop and bookkeeping of the generic wrapper. When no
+        # ignore_on types are given, the variants drop that except clause.
+        if config.max_retries == 0:
+            if ignore_on:
+                @wraps(func)
+                def wrapper(*args, **kwargs) -> Any:
+                    try:
+                        return func(*args, **kwargs)
+                    except ignore_on as e:
+                        log_ignored(e)
+                        raise
+                    except retry_on as e:
+                        log_failed(e, 1)
+                        raise
+            else:
+                @wraps(func)
+                def wrapper(*args, **kwargs) -> Any:
+                    try:
+                        return func(*args, **kwargs)
+                    except retry_on as e:
+                        log_failed(e, 1)
+                        raise
+
+            return wrapper
+
+        if config.max_retries == 1:
+            if ignore_on:
+                @wraps(func)
+                def wrapper(*args, **kwargs) -> Any:
+                    try:
+                        return func(*args, **kwargs)
+                    except ignore_on as e:
+                        log_ignored(e)
+                        raise
+                    except retry_on as e:
+                        wait_before_retry(e, 0)
+
+                    try:
+                        return func(*args, **kwargs)
+                    except ignore_on as e:
+                        log_ignored(e)
+                        raise
+                    except retry_on as e:
+                        log_failed(e, 2)
+                        raise
+            else:
+                @wraps(func)
+                def wrapper(*args, **kwargs) -> Any:
+                    try:
+                        return func(*args, **kwargs)
+                    except retry_on as e:
+                        wait_before_retry(e, 0)
+
+                    try:
+                        return func(*args, **kwargs)
+                    except retry_on as e:
+                        log_failed(e, 2)
+                        raise
+
+            return wrapper
+
+        last_attempt = config.max_retries
+
+        @wraps(func)
+        def _wrapper_with_ignore(*args, **kwargs) -> Any:
+            for attempt in range(last_attempt + 1):
                 try:
                     return func(*args, **kwargs)
 
                 except ignore_on as e:
                     # Re-raise immediately for ignored exceptions
-                    if log_attempts:
-                        _logger.warning(
-                            f"Function {func.__name__} raised non-retryable exception: {type(e).__name__}"
-                        )
+                    log_ignored(e)
                     raise
 
                 except retry_on as e:
-                    last_exception = e
-
                     # If this was the last attempt, raise the exception
-                    if attempt >= config.max_retries:
-                        if log_attempts:
-                            _logger.error(
-                                f"Function {func.__name__} failed after {attempt + 1} attempts: {str(e)}"
-                            )
+                    if attempt >= last_attempt:
+                        log_failed(e, attempt + 1)
                         raise
 
-                    # Calculate delay and wait
-                    delay = config.get_delay(attempt)
+                    wait_before_retry(e, attempt)
 
-                    if log_attempts:
-                        _logger.warning(
-                            f"Function {func.__name__} attempt {attempt + 1}/{config.max_retries + 1} "
-                            f"failed: {str(e)}. Retrying in {delay:.2f}s..."
-                        )
+        @wraps(func)
+        def _wrapper_no_ignore(*args, **kwargs) -> Any:
+            for attempt in range(last_attempt + 1):
+                try:
+                    return func(*args, **kwargs)
 
-                    time.sleep(delay)
+                except retry_on as e:
+                    # If this was the last attempt, raise the exception
+                    if attempt >= last_attempt:
+                        log_failed(e, attempt + 1)
+                        raise
 
-            # This should never be reached, but just in case
-            if last_exception:
-                raise last_exception
+                    wait_before_retry(e, attempt)
 
-        return wrapper
+        return _wrapper_with_ignore if ignore_on else _wrapper_no_ignore
     return decorator
 
 
@@ -185,7 +290,7 @@ class RetryableOperation:
         if self.attempt >= self.max_retries:
             if self.log_attempts:
                 _logger.error(
-                    f"Operation failed after {self.attempt + 1} attempts: {str(exc_val)}"
+                    "Operation failed after %d attempts: %s", self.attempt + 1, exc_val
                 )
             return False
 
@@ -194,8 +299,8 @@ class RetryableOperation:
 
         if self.log_attempts:
             _logger.warning(
-                f"Operation attempt {self.attempt + 1}/{self.max_retries + 1} "
-                f"failed: {str(exc_val)}. Retrying in {delay:.2f}s..."
+                "Operation attempt %d/%d failed: %s. Retrying in %.2fs...",
+                self.attempt + 1, self.max_retries + 1, exc_val, delay
             )
 
         time.sleep(delay)
@@ -249,14 +354,15 @@ def execute_with_retry(
 
             if attempt >= config.max_retries:
                 _logger.error(
-                    f"Function {func.__name__} failed after {attempt + 1} attempts: {str(e)}"
+                    "Function %s failed after %d attempts: %s",
+                    func.__name__, attempt + 1, e
                 )
                 raise
 
             delay = config.get_delay(attempt)
             _logger.warning(
-                f"Function {func.__name__} attempt {attempt + 1}/{config.max_retries + 1} "
-                f"failed: {str(e)}. Retrying in {delay:.2f}s..."
+                "Function %s attempt %d/%d failed: %s. Retrying in %.2fs...",
+                func.__name__, attempt + 1, config.max_retries + 1, e, delay
             )
             time.sleep(delay)
 
@@ -6,7 +6,7 @@ Route Optimizer Service
 Client for the Route Optimizer API that provides Vehicle Routing Problem (VRP) 
 optimization for shuttle and delivery routes.
 
-API Endpoint: POST /optimize
+API Endpoint: POST /optimize (POST /optimize/batch for several problems)
 Modes: PASSENGERS, WEIGHT, VOLUME, COLIS, MULTI
 
 Usage:
@@ -29,12 +29,109 @@ Usage:
     )
 """
 
+import asyncio
+import copy
+import gzip
+import hashlib
+import json
 import logging
+import math
+import time
 import requests
-from typing import List, Dict, Any, Optional, Literal
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import List, Dict, Any, Iterator, Optional, Literal, Sequence, Tuple
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _StreamJSONError = ijson.JSONError
+except ImportError:
+    IJSON_AVAILABLE = False
+    _StreamJSONError = ValueError
+
+# Payloads only hold plain JSON types (dict, list, str, int, float, bool,
+# None); anything else raises TypeError instead of being sent as its str()
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# ijson events carrying a scalar value
+_JSON_SCALAR_EVENTS = frozenset(('null', 'boolean', 'integer', 'double', 'number', 'string'))
+
+# Methods the HTTP adapter retries on 5xx; POST requests are never repeated
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Request bodies larger than this are gzip-compressed when compression is enabled
+GZIP_MIN_BYTES = 16384
+
+# Keys every depot/destination/location dict must provide, in report order
+_LOCATION_FIELDS = ('id', 'name', 'lat', 'lng')
+_LOCATION_FIELD_SET = frozenset(_LOCATION_FIELDS)
+
+# Vehicle capacity field that must be positive for each mode
+# (MULTI considers whatever capacities the vehicle provides)
+_MODE_CAPACITY_FIELD = {
+    'PASSENGERS': 'seats',
+    'WEIGHT': 'max_weight',
+    'VOLUME': 'max_volume',
+    'COLIS': 'max_colis',
+}
+
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0
+
+
+def _haversine_matrix(coords: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    """Pairwise great-circle distances in km between (lat, lng) points"""
+    if NUMPY_AVAILABLE:
+        points = np.deg2rad(np.asarray(coords, dtype=np.float64))
+        lats = points[:, 0]
+        lngs = points[:, 1]
+        dlat = lats[:, None] - lats[None, :]
+        dlng = lngs[:, None] - lngs[None, :]
+        a = np.sin(dlat / 2) ** 2 + np.cos(lats[:, None]) * np.cos(lats[None, :]) * np.sin(dlng / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).tolist()
+    
+    radians = [(math.radians(lat), math.radians(lng)) for lat, lng in coords]
+    matrix = []
+    for lat1, lng1 in radians:
+        cos_lat1 = math.cos(lat1)
+        row = []
+        for lat2, lng2 in radians:
+            a = (math.sin((lat2 - lat1) / 2) ** 2
+                 + cos_lat1 * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+            row.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+        matrix.append(row)
+    return matrix
+
 
 class RouteOptimizerError(Exception):
     """Exception raised when route optimization fails"""
@@ -58,13 +155,19 @@ class RouteOptimizerService:
     """
     
     MODES = ('PASSENGERS', 'WEIGHT', 'VOLUME', 'COLIS', 'MULTI')
+    _MODE_SET = frozenset(MODES)
     
     def __init__(
         self,
         api_url: str = 'https://route-optimizer.geniura.com/optimize',
         timeout: int = 60,
         speed_kmh: float = 40.0,
-        max_time_seconds: int = 30
+        max_time_seconds: int = 30,
+        cache_size: int = 0,
+        cache_ttl: float = 300.0,
+        send_distance_matrix: bool = False,
+        wire_format: Literal['aos', 'soa'] = 'aos',
+        compress_requests: bool = False
     ):
         """
         Initialize the Route Optimizer Service
@@ -74,38 +177,120 @@ class RouteOptimizerService:
             timeout: HTTP request timeout in seconds
             speed_kmh: Average vehicle speed for time estimation
             max_time_seconds: Maximum optimization time for the solver
+            cache_size: Maximum number of cached optimization results
+                (0, the default, disables the cache)
+            cache_ttl: Seconds a cached optimization result stays valid; the
+                same problem is answered from the cache for that long even
+                if the solver would now return a different route
+            send_distance_matrix: Send a precomputed haversine distance matrix
+                with each request (also enabled by health_check() when the
+                server advertises X-Supports-Matrix)
+            wire_format: 'aos' sends locations/vehicles as lists of dicts;
+                'soa' sends one array per field (see _pack_soa), which
+                requires a server-side SoA parser
+            compress_requests: gzip request bodies larger than GZIP_MIN_BYTES;
+                only enable when the server accepts Content-Encoding: gzip
         """
         self.api_url = api_url.rstrip('/')
         self.timeout = timeout
         self.speed_kmh = speed_kmh
         self.max_time_seconds = max_time_seconds
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.send_distance_matrix = send_distance_matrix
+        # Set by health checks when the server advertises X-Supports-Matrix;
+        # kept apart from the configured send_distance_matrix
+        self._server_supports_matrix = False
+        if wire_format not in ('aos', 'soa'):
+            raise RouteOptimizerError(f"Invalid wire format: {wire_format}")
+        self.wire_format = wire_format
+        self.compress_requests = compress_requests
+        # LRU of payload key -> (result, stored_at); identical problems
+        # (e.g. re-rendering an unchanged shift) skip the remote solver
+        self._cache: 'OrderedDict[str, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._cache_lock = Lock()
+        # Shared session so keep-alive connections are reused across calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=RETRY_METHODS
+            )
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
     
-    def _validate_location(self, location: Dict, name: str = 'location') -> None:
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    @staticmethod
+    def _check_location_fields(location: Dict, name: str) -> None:
         """Validate a location dictionary has required fields"""
-        required_fields = ['id', 'name', 'lat', 'lng']
-        for field in required_fields:
-            if field not in location:
-                raise RouteOptimizerError(f"{name} missing required field: {field}")
+        if not _LOCATION_FIELD_SET.issubset(location.keys()):
+            for field in _LOCATION_FIELDS:
+                if field not in location:
+                    raise RouteOptimizerError(f"{name} missing required field: {field}")
+    
+    def _validate_location(self, location: Dict, name: str = 'location') -> None:
+        """Validate a location dictionary has required fields and valid coordinates"""
+        self._check_location_fields(location, name)
         
         if not (-90 <= location['lat'] <= 90):
             raise RouteOptimizerError(f"{name} latitude must be between -90 and 90")
         if not (-180 <= location['lng'] <= 180):
             raise RouteOptimizerError(f"{name} longitude must be between -180 and 180")
     
+    def _validate_locations(self, locations: List[Dict]) -> None:
+        """
+        Validate all locations, checking coordinate bounds in one vectorized
+        pass when NumPy is available
+        """
+        if not NUMPY_AVAILABLE:
+            for i, loc in enumerate(locations):
+                self._validate_location(loc, f'Location {i+1}')
+            return
+        
+        for i, loc in enumerate(locations):
+            self._check_location_fields(loc, f'Location {i+1}')
+        
+        coords = np.fromiter(
+            (value for loc in locations for value in (loc['lat'], loc['lng'])),
+            dtype=np.float64,
+            count=2 * len(locations)
+        ).reshape(-1, 2)
+        lats = coords[:, 0]
+        lngs = coords[:, 1]
+        bad_lat = ~((lats >= -90) & (lats <= 90))
+        bad_lng = ~((lngs >= -180) & (lngs <= 180))
+        bad = bad_lat | bad_lng
+        if bad.any():
+            i = int(np.argmax(bad))
+            if bad_lat[i]:
+                raise RouteOptimizerError(f"Location {i+1} latitude must be between -90 and 90")
+            raise RouteOptimizerError(f"Location {i+1} longitude must be between -180 and 180")
+    
     def _validate_vehicle(self, vehicle: Dict, mode: str) -> None:
         """Validate a vehicle dictionary has required fields for the mode"""
         if 'id' not in vehicle or 'name' not in vehicle:
             raise RouteOptimizerError("Vehicle missing required field: id or name")
         
-        # Check capacity fields based on mode
-        if mode == 'PASSENGERS' and vehicle.get('seats', 0) <= 0:
-            raise RouteOptimizerError(f"Vehicle '{vehicle['name']}' must have positive seats for PASSENGERS mode")
-        if mode == 'WEIGHT' and vehicle.get('max_weight', 0) <= 0:
-            raise RouteOptimizerError(f"Vehicle '{vehicle['name']}' must have positive max_weight for WEIGHT mode")
-        if mode == 'VOLUME' and vehicle.get('max_volume', 0) <= 0:
-            raise RouteOptimizerError(f"Vehicle '{vehicle['name']}' must have positive max_volume for VOLUME mode")
-        if mode == 'COLIS' and vehicle.get('max_colis', 0) <= 0:
-            raise RouteOptimizerError(f"Vehicle '{vehicle['name']}' must have positive max_colis for COLIS mode")
+        # Check capacity field based on mode
+        field = _MODE_CAPACITY_FIELD.get(mode)
+        if field and vehicle.get(field, 0) <= 0:
+            raise RouteOptimizerError(
+                f"Vehicle '{vehicle['name']}' must have positive {field} for {mode} mode"
+            )
     
     def optimize(
         self,
@@ -115,7 +300,8 @@ class RouteOptimizerService:
         vehicles: List[Dict[str, Any]],
         destination: Optional[Dict[str, Any]] = None,
         speed_kmh: Optional[float] = None,
-        max_time_seconds: Optional[int] = None
+        max_time_seconds: Optional[int] = None,
+        pre_validated: bool = False
     ) -> Dict[str, Any]:
         """
         Optimize routes using the Route Optimizer API
@@ -128,6 +314,8 @@ class RouteOptimizerService:
             destination: End point (if different from depot)
             speed_kmh: Override default average speed
             max_time_seconds: Override default max optimization time
+            pre_validated: Skip per-location/per-vehicle validation when the
+                caller already validated the same fleet and locations
         
         Returns:
             Dictionary with optimization results:
@@ -153,28 +341,50 @@ class RouteOptimizerService:
         Raises:
             RouteOptimizerError: If optimization fails or API returns an error
         """
+        payload = self._build_payload(
+            mode, depot, locations, vehicles,
+            destination=destination,
+            speed_kmh=speed_kmh,
+            max_time_seconds=max_time_seconds,
+            pre_validated=pre_validated
+        )
+        return self._post_optimize(payload)
+    
+    def _build_payload(
+        self,
+        mode: str,
+        depot: Dict[str, Any],
+        locations: List[Dict[str, Any]],
+        vehicles: List[Dict[str, Any]],
+        destination: Optional[Dict[str, Any]] = None,
+        speed_kmh: Optional[float] = None,
+        max_time_seconds: Optional[int] = None,
+        pre_validated: bool = False
+    ) -> Dict[str, Any]:
+        """Validate optimize() arguments and build the API request payload"""
         # Validate mode
-        if mode not in self.MODES:
+        if mode not in self._MODE_SET:
             raise RouteOptimizerError(f"Invalid mode: {mode}. Must be one of {self.MODES}")
         
-        # Validate depot
-        self._validate_location(depot, 'Depot')
-        
-        # Validate destination if provided
-        if destination:
-            self._validate_location(destination, 'Destination')
-        
-        # Validate locations
         if not locations:
             raise RouteOptimizerError("At least one location is required")
-        for i, loc in enumerate(locations):
-            self._validate_location(loc, f'Location {i+1}')
-        
-        # Validate vehicles
         if not vehicles:
             raise RouteOptimizerError("At least one vehicle is required")
-        for vehicle in vehicles:
-            self._validate_vehicle(vehicle, mode)
+        
+        if not pre_validated:
+            # Validate depot
+            self._validate_location(depot, 'Depot')
+            
+            # Validate destination if provided
+            if destination:
+                self._validate_location(destination, 'Destination')
+            
+            # Validate locations
+            self._validate_locations(locations)
+            
+            # Validate vehicles
+            for vehicle in vehicles:
+                self._validate_vehicle(vehicle, mode)
         
         # Prepare request payload
         payload = {
@@ -187,51 +397,238 @@ class RouteOptimizerService:
             'max_time_seconds': max_time_seconds or self.max_time_seconds
         }
         
+        if self.send_distance_matrix or self._server_supports_matrix:
+            # Matrix order: depot, locations..., destination (if any)
+            points = [depot] + list(locations) + ([destination] if destination else [])
+            payload['distance_matrix_km'] = _haversine_matrix(
+                [(float(p['lat']), float(p['lng'])) for p in points]
+            )
+        
+        return payload
+    
+    @staticmethod
+    def _payload_key(payload: Dict[str, Any]) -> str:
+        """Stable hash of a normalized optimization payload"""
+        data = _json_dumps(payload, sort_keys=True)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _pack_soa(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Convert a list of dicts into one list per field (struct of arrays)
+        
+        Fields missing from some rows are filled with None, e.g.:
+            [{'id': 'a', 'lat': 1.0}, {'id': 'b', 'lat': 2.0}]
+            -> {'id': ['a', 'b'], 'lat': [1.0, 2.0]}
+        """
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+        return {field: [row.get(field) for row in rows] for field in fields}
+    
+    def _wire_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the configured wire format to an (AoS) optimization payload"""
+        if self.wire_format != 'soa':
+            return payload
+        wire = dict(payload)
+        wire['wire_format'] = 'soa'
+        wire['locations'] = self._pack_soa(payload['locations'])
+        wire['vehicles'] = self._pack_soa(payload['vehicles'])
+        return wire
+    
+    def _encode_optimize_body(self, payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        """Serialize a single optimization payload in the configured wire format"""
+        return self._encode_body(self._wire_payload(payload))
+    
+    def _encode_body(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Serialize a request payload, gzip-compressing large bodies if enabled"""
+        return self._frame_body(_json_dumps(payload))
+    
+    def _frame_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Request headers for a JSON body, gzip-compressing large bodies if enabled"""
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        if self.compress_requests and len(body) > GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=1)
+            headers['Content-Encoding'] = 'gzip'
+        return body, headers
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result for key, dropping it if expired"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            result, stored_at = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return result
+    
+    def _cache_put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result, evicting the least recently used entries"""
+        with self._cache_lock:
+            self._cache[key] = (result, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop cached optimization results
+        
+        Args:
+            key: Payload key to drop (None = clear the whole cache)
+        """
+        with self._cache_lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+    
+    def _lookup_cached(self, payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (cache key, cached result) for a payload about to be sent"""
+        key = None
+        if self.cache_size > 0:
+            key = self._payload_key(payload)
+            cached = self._cache_get(key)
+            if cached is not None:
+                _logger.debug("Route Optimizer cache hit: %s", key)
+                return key, copy.deepcopy(cached)
+        
         _logger.info(
             "Sending optimization request: mode=%s, locations=%d, vehicles=%d",
-            mode, len(locations), len(vehicles)
+            payload['mode'], len(payload['locations']), len(payload['vehicles'])
         )
+        return key, None
+    
+    def _handle_result(self, key: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Log and cache a successful optimization result"""
+        _logger.info(
+            "Optimization completed: success=%s, routes=%d, distance=%.2f km",
+            result.get('success', False),
+            len(result.get('routes', [])),
+            result.get('total_distance_km', 0)
+        )
+        
+        if key is not None:
+            self._cache_put(key, copy.deepcopy(result))
+        
+        return result
+    
+    def _post_optimize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single optimization payload and return the parsed result"""
+        key, cached = self._lookup_cached(payload)
+        if cached is not None:
+            return cached
+        
+        body, headers = self._encode_optimize_body(payload)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                json=payload,
+                data=body,
                 timeout=self.timeout,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                }
+                headers=headers
             )
             
             # Check for HTTP errors
             if response.status_code != 200:
-                error_detail = "Unknown error"
-                try:
-                    error_data = response.json()
-                    error_detail = error_data.get('detail', str(error_data))
-                except Exception:
-                    error_detail = response.text[:500]
-                
-                _logger.error(
-                    "Route Optimizer API error: status=%d, detail=%s",
-                    response.status_code, error_detail
-                )
-                raise RouteOptimizerError(
-                    f"API error (HTTP {response.status_code}): {error_detail}",
-                    response_data={'status_code': response.status_code, 'detail': error_detail}
-                )
+                self._raise_api_error(response)
             
-            result = response.json()
+            return self._handle_result(key, self._decode_response(response))
+            
+        except requests.Timeout:
+            _logger.error("Route Optimizer API timeout after %d seconds", self.timeout)
+            raise RouteOptimizerError(f"API request timed out after {self.timeout} seconds")
+        except requests.ConnectionError as e:
+            _logger.error("Route Optimizer API connection error: %s", str(e))
+            raise RouteOptimizerError(f"Failed to connect to Route Optimizer API: {str(e)}")
+        except requests.RequestException as e:
+            _logger.error("Route Optimizer API request error: %s", str(e))
+            raise RouteOptimizerError(f"API request failed: {str(e)}")
+    
+    def optimize_stream(
+        self,
+        mode: str,
+        depot: Dict[str, Any],
+        locations: List[Dict[str, Any]],
+        vehicles: List[Dict[str, Any]],
+        destination: Optional[Dict[str, Any]] = None,
+        speed_kmh: Optional[float] = None,
+        max_time_seconds: Optional[int] = None,
+        pre_validated: bool = False,
+        summary: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Optimize routes and yield the resulting routes one at a time
+        
+        Same arguments as optimize(). The response body is parsed
+        incrementally (with ijson when installed) so large results are
+        never held in memory as a whole; use optimize() to get the full
+        result dict instead. Streamed results are not cached.
+        
+        Args:
+            summary: Optional dict filled with the top-level result fields
+                     (success, message, total_distance_km, unassigned...)
+                     once the generator is exhausted
+        
+        Yields:
+            Route dicts, in the same format as optimize()['routes']
+        
+        Raises:
+            RouteOptimizerError: If optimization fails or API returns an error
+        """
+        payload = self._build_payload(
+            mode, depot, locations, vehicles,
+            destination=destination,
+            speed_kmh=speed_kmh,
+            max_time_seconds=max_time_seconds,
+            pre_validated=pre_validated
+        )
+        if summary is None:
+            summary = {}
+        
+        key, cached = self._lookup_cached(payload)
+        if cached is not None:
+            routes = cached.pop('routes', [])
+            summary.update(cached)
+            yield from routes
+            return
+        
+        body, headers = self._encode_optimize_body(payload)
+        
+        try:
+            with self._session.post(
+                self.api_url,
+                data=body,
+                timeout=self.timeout,
+                headers=headers,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self._raise_api_error(response)
+                
+                if IJSON_AVAILABLE:
+                    # Undo any Content-Encoding while reading the raw stream
+                    response.raw.decode_content = True
+                    routes = self._iter_routes(response.raw, summary)
+                else:
+                    result = self._decode_response(response)
+                    routes = result.pop('routes', [])
+                    summary.update(result)
+                
+                count = 0
+                for route in routes:
+                    count += 1
+                    yield route
             
             _logger.info(
-                "Optimization completed: success=%s, routes=%d, distance=%.2f km",
-                result.get('success', False),
-                len(result.get('routes', [])),
-                result.get('total_distance_km', 0)
+                "Streamed optimization completed: success=%s, routes=%d, distance=%.2f km",
+                summary.get('success', False), count, summary.get('total_distance_km', 0)
             )
             
-            return result
-            
         except requests.Timeout:
             _logger.error("Route Optimizer API timeout after %d seconds", self.timeout)
             raise RouteOptimizerError(f"API request timed out after {self.timeout} seconds")
@@ -241,6 +638,71 @@ class RouteOptimizerService:
         except requests.RequestException as e:
             _logger.error("Route Optimizer API request error: %s", str(e))
             raise RouteOptimizerError(f"API request failed: {str(e)}")
+        except _StreamJSONError as e:
+            _logger.error("Route Optimizer API returned invalid JSON: %s", str(e))
+            raise RouteOptimizerError(f"Invalid API response: {str(e)}")
+    
+    @staticmethod
+    def _iter_routes(stream, summary: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Incrementally parse an optimization result, yielding each route
+        
+        Every other top-level member ('unassigned', nested objects,
+        scalars) is collected into summary in the same single pass.
+        """
+        builder = None
+        target = None
+        depth = 0
+        for prefix, event, value in ijson.parse(stream, use_float=True):
+            if builder is None:
+                if prefix in ('', 'routes'):
+                    # The enclosing object and the routes array itself
+                    continue
+                if event in _JSON_SCALAR_EVENTS:
+                    if '.' not in prefix:
+                        summary[prefix] = value
+                    continue
+                # Start of a route or of another top-level object/array
+                builder = ijson.ObjectBuilder()
+                target = prefix
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if depth == 0:
+                    if target == 'routes.item':
+                        yield builder.value
+                    else:
+                        summary[target] = builder.value
+                    builder = None
+    
+    @staticmethod
+    def _decode_response(response) -> Any:
+        """Parsed JSON body of an API response"""
+        try:
+            return _json_loads(response.content)
+        except ValueError as e:
+            _logger.error("Route Optimizer API returned invalid JSON: %s", str(e))
+            raise RouteOptimizerError(f"Invalid JSON response: {str(e)}")
+    
+    def _raise_api_error(self, response) -> None:
+        """Raise RouteOptimizerError describing a non-200 API response"""
+        error_detail = "Unknown error"
+        try:
+            error_data = response.json()
+            error_detail = error_data.get('detail', str(error_data))
+        except Exception:
+            error_detail = response.text[:500]
+        
+        _logger.error(
+            "Route Optimizer API error: status=%d, detail=%s",
+            response.status_code, error_detail
+        )
+        raise RouteOptimizerError(
+            f"API error (HTTP {response.status_code}): {error_detail}",
+            response_data={'status_code': response.status_code, 'detail': error_detail}
+        )
     
     def optimize_passenger_route(
         self,
@@ -315,6 +777,110 @@ class RouteOptimizerService:
             **kwargs
         )
     
+    def optimize_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Optimize several independent problems (e.g. one per shift) at once
+        
+        All problems are sent in a single POST to the `<api_url>/batch`
+        endpoint. If the server has no batch route (HTTP 404/405), the
+        problems are sent concurrently over the shared session instead;
+        problems left without a usable result in the batch response (e.g.
+        items missing their id) are resent the same way.
+        
+        Batch request/response shape:
+            {'requests': [{'id': 0, 'payload': {...}}, ...]}
+            {'responses': [{'id': 0, 'status': 200, 'body': {...}}, ...]}
+        
+        Args:
+            batch: List of keyword-argument dicts, each accepted by optimize()
+            max_workers: Concurrency of the per-problem fallback
+        
+        Returns:
+            List of optimization results, in the same order as `batch`
+        
+        Raises:
+            RouteOptimizerError: If any problem is invalid or fails
+        """
+        if not batch:
+            return []
+        
+        payloads = [self._build_payload(**kwargs) for kwargs in batch]
+        
+        _logger.info("Sending batch optimization request: problems=%d", len(payloads))
+        
+        body, headers = self._encode_body({'requests': [
+            {'id': i, 'payload': self._wire_payload(payload)} for i, payload in enumerate(payloads)
+        ]})
+        
+        try:
+            response = self._session.post(
+                f"{self.api_url}/batch",
+                data=body,
+                timeout=self.timeout,
+                headers=headers
+            )
+        except requests.Timeout:
+            _logger.error("Route Optimizer API timeout after %d seconds", self.timeout)
+            raise RouteOptimizerError(f"API request timed out after {self.timeout} seconds")
+        except requests.RequestException as e:
+            _logger.error("Route Optimizer API request error: %s", str(e))
+            raise RouteOptimizerError(f"API request failed: {str(e)}")
+        
+        if response.status_code in (404, 405):
+            _logger.info("Route Optimizer API has no batch route, sending problems concurrently")
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as executor:
+                return list(executor.map(self._post_optimize, payloads))
+        
+        if response.status_code != 200:
+            self._raise_api_error(response)
+        
+        data = self._decode_response(response)
+        items = data.get('responses') if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise RouteOptimizerError("Invalid batch response: 'responses' list is missing")
+        
+        results = [None] * len(payloads)
+        malformed = 0
+        for item in items:
+            item_id = item.get('id') if isinstance(item, dict) else None
+            if not isinstance(item_id, int) or not 0 <= item_id < len(payloads):
+                # Cannot be matched to a problem; reported below as a missing result
+                _logger.warning("Route Optimizer batch response item without a valid id: %.200r", item)
+                malformed += 1
+                continue
+            status = item.get('status', 200)
+            if status != 200:
+                body = item.get('body') or {}
+                detail = body.get('detail', str(body)) if isinstance(body, dict) else str(body)
+                raise RouteOptimizerError(
+                    f"API error for batch problem {item_id} (HTTP {status}): {detail}",
+                    response_data={'status_code': status, 'detail': detail, 'id': item_id}
+                )
+            results[item_id] = item.get('body')
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            # Problems without a usable result (e.g. malformed items) are sent
+            # again one by one, so the rest of the batch is kept
+            _logger.warning(
+                "Route Optimizer batch response is missing results for problems %s "
+                "(%d malformed items), sending them individually", missing, malformed
+            )
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                for i, result in zip(missing, executor.map(self._post_optimize, [payloads[i] for i in missing])):
+                    results[i] = result
+        
+        return results
+    
+    def _detect_matrix_support(self, response) -> None:
+        """Enable distance matrix upload if the server advertises it"""
+        if response.headers.get('X-Supports-Matrix', '').lower() in ('1', 'true', 'yes'):
+            self._server_supports_matrix = True
+    
     def health_check(self) -> bool:
         """
         Check if the Route Optimizer API is healthy
@@ -325,10 +891,11 @@ class RouteOptimizerService:
         try:
             # Get the base URL (remove /optimize)
             base_url = self.api_url.replace('/optimize', '')
-            response = requests.get(
+            response = self._session.get(
                 f"{base_url}/health",
                 timeout=10
             )
+            self._detect_matrix_support(response)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('status') == 'healthy'
@@ -337,6 +904,136 @@ class RouteOptimizerService:
             _logger.warning("Route Optimizer health check failed: %s", str(e))
             return False
 
+    
+    def _async_client(self):
+        """New httpx.AsyncClient (HTTP/2 when the h2 package is installed)"""
+        limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        try:
+            return httpx.AsyncClient(http2=True, timeout=self.timeout, limits=limits)
+        except ImportError:
+            return httpx.AsyncClient(timeout=self.timeout, limits=limits)
+    
+    async def _post_optimize_async(self, payload: Dict[str, Any], client=None) -> Dict[str, Any]:
+        """Async counterpart of _post_optimize"""
+        if not HTTPX_AVAILABLE:
+            # Keep the event loop free by running the pooled sync call in a thread
+            return await asyncio.to_thread(self._post_optimize, payload)
+        
+        if client is None:
+            async with self._async_client() as client:
+                return await self._post_optimize_async(payload, client)
+        
+        key, cached = self._lookup_cached(payload)
+        if cached is not None:
+            return cached
+        
+        body, headers = self._encode_optimize_body(payload)
+        
+        try:
+            response = await client.post(self.api_url, content=body, headers=headers)
+        except httpx.TimeoutException:
+            _logger.error("Route Optimizer API timeout after %d seconds", self.timeout)
+            raise RouteOptimizerError(f"API request timed out after {self.timeout} seconds")
+        except httpx.ConnectError as e:
+            _logger.error("Route Optimizer API connection error: %s", str(e))
+            raise RouteOptimizerError(f"Failed to connect to Route Optimizer API: {str(e)}")
+        except httpx.HTTPError as e:
+            _logger.error("Route Optimizer API request error: %s", str(e))
+            raise RouteOptimizerError(f"API request failed: {str(e)}")
+        
+        if response.status_code != 200:
+            self._raise_api_error(response)
+        
+        return self._handle_result(key, self._decode_response(response))
+    
+    async def optimize_async(
+        self,
+        mode: Literal['PASSENGERS', 'WEIGHT', 'VOLUME', 'COLIS', 'MULTI'],
+        depot: Dict[str, Any],
+        locations: List[Dict[str, Any]],
+        vehicles: List[Dict[str, Any]],
+        destination: Optional[Dict[str, Any]] = None,
+        speed_kmh: Optional[float] = None,
+        max_time_seconds: Optional[int] = None,
+        pre_validated: bool = False,
+        client=None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of optimize()
+        
+        Uses httpx when installed, otherwise runs the sync request in a
+        worker thread so the event loop is never blocked.
+        
+        Args:
+            client: Optional httpx.AsyncClient to reuse (see optimize())
+                    for the other arguments
+        
+        Returns:
+            Optimization result dictionary (see optimize())
+        """
+        payload = self._build_payload(
+            mode, depot, locations, vehicles,
+            destination=destination,
+            speed_kmh=speed_kmh,
+            max_time_seconds=max_time_seconds,
+            pre_validated=pre_validated
+        )
+        return await self._post_optimize_async(payload, client)
+    
+    async def optimize_many_async(self, problems: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several optimize() problems concurrently over one connection pool
+        
+        Args:
+            problems: List of keyword-argument dicts, each accepted by optimize()
+        
+        Returns:
+            List of optimization results, in the same order as `problems`
+        """
+        payloads = [self._build_payload(**kwargs) for kwargs in problems]
+        if not payloads:
+            return []
+        
+        if not HTTPX_AVAILABLE:
+            return list(await asyncio.gather(
+                *(self._post_optimize_async(payload) for payload in payloads)
+            ))
+        
+        async with self._async_client() as client:
+            return list(await asyncio.gather(
+                *(self._post_optimize_async(payload, client) for payload in payloads)
+            ))
+    
+    async def health_check_async(self, client=None) -> bool:
+        """
+        Async variant of health_check()
+        
+        Returns:
+            True if API is healthy, False otherwise
+        """
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.health_check)
+        
+        if client is None:
+            async with self._async_client() as client:
+                return await self.health_check_async(client)
+        
+        try:
+            base_url = self.api_url.replace('/optimize', '')
+            response = await client.get(f"{base_url}/health", timeout=10)
+            self._detect_matrix_support(response)
+            if response.status_code == 200:
+                return _json_loads(response.content).get('status') == 'healthy'
+            return False
+        except Exception as e:
+            _logger.warning("Route Optimizer health check failed: %s", str(e))
+            return False
+
+
+# Shared services keyed by (database name, url, timeout, speed, max time)
+_SERVICE_CACHE: Dict[Tuple[str, str, int, float, int], RouteOptimizerService] = {}
+_SERVICE_CACHE_LOCK = Lock()
+
 
 def create_route_optimizer_service(env) -> RouteOptimizerService:
     """
@@ -348,6 +1045,10 @@ def create_route_optimizer_service(env) -> RouteOptimizerService:
     - shuttlebee.route_optimizer_speed_kmh
     - shuttlebee.route_optimizer_max_time
     
+    The service is built once per database and reused (keeping its HTTP
+    session warm) as long as these parameters keep their values, however
+    they are changed (settings form, Technical > Parameters, set_param).
+    
     Args:
         env: Odoo environment
     
@@ -356,6 +1057,7 @@ def create_route_optimizer_service(env) -> RouteOptimizerService:
     """
     IrConfigParam = env['ir.config_parameter'].sudo()
     
+    dbname = env.cr.dbname
     api_url = IrConfigParam.get_param(
         'shuttlebee.route_optimizer_url',
         'https://route-optimizer.geniura.com/optimize'
@@ -370,10 +1072,29 @@ def create_route_optimizer_service(env) -> RouteOptimizerService:
         'shuttlebee.route_optimizer_max_time', 30
     ) or 30)
     
-    return RouteOptimizerService(
+    key = (dbname, api_url, timeout, speed_kmh, max_time)
+    service = _SERVICE_CACHE.get(key)
+    if service is not None:
+        return service
+    
+    service = RouteOptimizerService(
         api_url=api_url,
         timeout=timeout,
         speed_kmh=speed_kmh,
         max_time_seconds=max_time
     )
+    
+    with _SERVICE_CACHE_LOCK:
+        existing = _SERVICE_CACHE.get(key)
+        if existing is not None:
+            service.close()
+            return existing
+        # Replace services built from an older configuration of this database
+        stale = [_SERVICE_CACHE.pop(k) for k in [k for k in _SERVICE_CACHE if k[0] == dbname]]
+        _SERVICE_CACHE[key] = service
+    
+    # Requests still running on a closed service finish; its sockets are then dropped
+    for stale_service in stale:
+        stale_service.close()
+    return service
 
@@ -4,7 +4,10 @@ Security utilities for credential management and safe template rendering
 """
 
 import logging
-import base64
+import binascii
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
 from typing import Any, Dict, Optional, Tuple
 from jinja2 import Template, Environment, StrictUndefined, select_autoescape
 from jinja2.exceptions import TemplateError
@@ -13,6 +16,36 @@ from odoo import _
 
 _logger = logging.getLogger(__name__)
 
+# Marker prepended to values produced by CredentialManager.encrypt_value
+ENCRYPTED_PREFIX = 'encrypted:'
+
+# Context value types passed to templates unchanged
+_SAFE_TYPES_TUPLE = (str, int, float, bool, type(None))
+_SAFE_TYPES = frozenset(_SAFE_TYPES_TUPLE)
+
+# Maximum number of compiled templates kept per SafeTemplateRenderer
+TEMPLATE_CACHE_SIZE = 128
+
+
+def _make_jinja_env(autoescape: bool) -> Environment:
+    return Environment(
+        undefined=StrictUndefined,
+        autoescape=select_autoescape(['html', 'xml']) if autoescape else False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+# Process-wide environments shared by all renderers
+_JINJA_ENV = _make_jinja_env(autoescape=True)
+_JINJA_ENV_NOESCAPE = _make_jinja_env(autoescape=False)
+
+
+@lru_cache(maxsize=64)
+def _selection_labels(field) -> Dict[str, str]:
+    """Value -> label mapping of a static Selection field"""
+    return dict(field.selection)
+
 
 class CredentialManager:
     """Secure credential storage and retrieval"""
@@ -37,8 +70,8 @@ class CredentialManager:
 
         try:
             # Basic encoding (for demonstration - use proper encryption in production!)
-            encoded = base64.b64encode(value.encode('utf-8')).decode('utf-8')
-            return f'encrypted:{encoded}'
+            encoded = binascii.b2a_base64(value.encode('utf-8'), newline=False).decode('ascii')
+            return ENCRYPTED_PREFIX + encoded
         except Exception as e:
             _logger.error(f'Failed to encrypt value: {str(e)}')
             raise UserError(_('Failed to encrypt sensitive data'))
@@ -60,14 +93,13 @@ class CredentialManager:
 
         try:
             # Check if value is actually encrypted
-            if not encrypted_value.startswith('encrypted:'):
+            if not encrypted_value.startswith(ENCRYPTED_PREFIX):
                 _logger.warning('Value is not encrypted, returning as-is')
                 return encrypted_value
 
             # Remove prefix and decode
-            encoded = encrypted_value[10:]  # Remove 'encrypted:' prefix
-            decoded = base64.b64decode(encoded.encode('utf-8')).decode('utf-8')
-            return decoded
+            encoded = encrypted_value[len(ENCRYPTED_PREFIX):]
+            return binascii.a2b_base64(encoded).decode('utf-8')
 
         except Exception as e:
             _logger.error(f'Failed to decrypt value: {str(e)}')
@@ -109,12 +141,36 @@ class SafeTemplateRenderer:
         Args:
             autoescape: Whether to automatically escape HTML
         """
-        self.env = Environment(
-            undefined=StrictUndefined,
-            autoescape=select_autoescape(['html', 'xml']) if autoescape else False,
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
+        self.env = _JINJA_ENV if autoescape else _JINJA_ENV_NOESCAPE
+        # Compiled templates keyed by source; Jinja only caches templates
+        # loaded through get_template, not from_string
+        self._tpl_cache: 'OrderedDict[str, Template]' = OrderedDict()
+        self._tpl_cache_lock = Lock()
+
+    def _get_template(self, template_string: str) -> Template:
+        """
+        Return the compiled template for a source string, compiling it once
+
+        Args:
+            template_string: Template string with Jinja2 syntax
+
+        Returns:
+            Template: Compiled Jinja2 template
+        """
+        with self._tpl_cache_lock:
+            template = self._tpl_cache.get(template_string)
+            if template is not None:
+                self._tpl_cache.move_to_end(template_string)
+                return template
+
+        template = self.env.from_string(template_string)
+
+        with self._tpl_cache_lock:
+            self._tpl_cache[template_string] = template
+            if len(self._tpl_cache) > TEMPLATE_CACHE_SIZE:
+                self._tpl_cache.popitem(last=False)
+
+        return template
 
     def render(self, template_string: str, context: Dict[str, Any]) -> str:
         """
@@ -138,7 +194,7 @@ class SafeTemplateRenderer:
             safe_context = self._sanitize_context(context)
 
             # Render template
-            template = self.env.from_string(template_string)
+            template = self._get_template(template_string)
             return template.render(**safe_context)
 
         except TemplateError as e:
@@ -174,11 +230,12 @@ class SafeTemplateRenderer:
         context = {}
 
         if trip:
+            start = trip.planned_start_time
             context.update({
                 'trip_name': trip.name or '',
-                'trip_date': trip.date.strftime('%Y-%m-%d') if trip.date else '',
-                'trip_time': trip.planned_start_time.strftime('%H:%M') if trip.planned_start_time else '',
-                'trip_type': dict(trip._fields['trip_type'].selection).get(trip.trip_type, ''),
+                'trip_date': trip.date.isoformat() if trip.date else '',
+                'trip_time': f'{start.hour:02d}:{start.minute:02d}' if start else '',
+                'trip_type': _selection_labels(trip._fields['trip_type']).get(trip.trip_type, ''),
             })
 
         if passenger:
@@ -211,8 +268,9 @@ class SafeTemplateRenderer:
         safe_context = {}
 
         for key, value in context.items():
-            # Only allow safe types
-            if isinstance(value, (str, int, float, bool, type(None))):
+            # Only allow safe types (exact-type hash lookup first, then
+            # subclasses such as Markup)
+            if type(value) in _SAFE_TYPES or isinstance(value, _SAFE_TYPES_TUPLE):
                 safe_context[key] = value
             elif hasattr(value, 'name'):
                 # For Odoo records, use safe attributes
@@ -238,8 +296,7 @@ class SafeTemplateRenderer:
             return True, None
 
         try:
-            env = Environment(undefined=StrictUndefined)
-            env.from_string(template_string)
+            _JINJA_ENV_NOESCAPE.from_string(template_string)
             return True, None
         except TemplateError as e:
             return False, str(e)
@@ -4,7 +4,7 @@ Centralized validation utilities for ShuttleBee
 Provides reusable validation methods for phone numbers, emails, coordinates, etc.
 """
 
-import re
+import string
 import logging
 from typing import Optional, Tuple
 from odoo.exceptions import ValidationError
@@ -12,6 +12,14 @@ from odoo import _
 
 _logger = logging.getLogger(__name__)
 
+# Precompiled patterns/tables shared by all validation calls
+_EMAIL_LOCAL_OK = frozenset(string.ascii_letters + string.digits + '._%+-')
+_EMAIL_DOMAIN_OK = frozenset(string.ascii_letters + string.digits + '.-')
+_PHONE_STRIP = str.maketrans('', '', string.whitespace + '-()+')
+_CLEAN_TABLE = str.maketrans('', '', string.whitespace + '-()')
+# Separators tolerated in phone input; whatever remains must be digits
+_PHONE_SEPARATORS_TABLE = str.maketrans('', '', string.whitespace + '-().+/')
+
 try:
     import phonenumbers
     PHONENUMBERS_AVAILABLE = True
@@ -49,6 +57,17 @@ class ValidationHelper:
 
         # Use phonenumbers library if available
         if PHONENUMBERS_AVAILABLE:
+            # Cheap pre-filter: plain ASCII input must be 7-15 digits once
+            # separators are removed, so skip the parser for obvious rejects.
+            # Non-ASCII input (e.g. Arabic-Indic digits) is left to the parser.
+            digits = phone.translate(_PHONE_SEPARATORS_TABLE)
+            if digits.isascii() and not (digits.isdigit() and 7 <= len(digits) <= 15):
+                if raise_error:
+                    raise ValidationError(
+                        _('Invalid phone number: %s. Please provide a valid phone number.') % phone
+                    )
+                return False
+
             try:
                 parsed = phonenumbers.parse(phone, country_code)
                 is_valid = phonenumbers.is_valid_number(parsed)
@@ -67,8 +86,8 @@ class ValidationHelper:
                 return False
 
         # Fallback to basic validation if phonenumbers not available
-        phone_clean = re.sub(r'[\s\-\(\)\+]', '', phone)
-        is_valid = bool(re.match(r'^\d{7,15}$', phone_clean))
+        phone_clean = phone.translate(_PHONE_STRIP)
+        is_valid = phone_clean.isdecimal() and 7 <= len(phone_clean) <= 15
 
         if not is_valid and raise_error:
             raise ValidationError(
@@ -96,9 +115,19 @@ class ValidationHelper:
                 raise ValidationError(_('Email address is required!'))
             return False
 
-        # RFC 5322 compliant email regex (simplified)
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        is_valid = bool(re.match(pattern, email))
+        # Simplified RFC 5322 check (local@domain.tld) in a single linear
+        # pass, without regex backtracking on malformed input
+        local, _sep, domain = email.partition('@')
+        host, _dot, tld = domain.rpartition('.')
+        is_valid = (
+            1 <= len(local) <= 64
+            and 4 <= len(domain) <= 255
+            and '@' not in domain
+            and bool(host)
+            and len(tld) >= 2 and tld.isascii() and tld.isalpha()
+            and _EMAIL_LOCAL_OK.issuperset(local)
+            and _EMAIL_DOMAIN_OK.issuperset(host)
+        )
 
         if not is_valid and raise_error:
             raise ValidationError(_('Invalid email format: %s') % email)
@@ -164,7 +193,7 @@ class ValidationHelper:
             return ''
 
         # Remove common separators and spaces
-        phone_clean = re.sub(r'[\s\-\(\)]', '', phone)
+        phone_clean = phone.translate(_CLEAN_TABLE)
 
         # Remove leading + if present
         if phone_clean.startswith('+'):
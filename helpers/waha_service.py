@@ -12,15 +12,75 @@ API Endpoints:
 - Chatting: /api/sendText, /api/sendImage, etc.
 """
 
+import asyncio
+import functools
+import inspect
+import json
 import logging
+import socket
+import string
+import sys
+import time
 import requests
 import base64
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, List, Tuple, Union
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
+from threading import Lock
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# Seconds allowed to establish a connection; the read timeout is WAHAConfig.timeout
+CONNECT_TIMEOUT = 5
+
+# Deletes every ASCII character except 0-9
+_NON_DIGITS_TABLE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if chr(c) not in string.digits
+))
+
+# Methods the HTTP adapter retries on 429/5xx. POST (sendText, sendImage...)
+# is left out: repeating it after a lost response could deliver a message twice
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Shared services kept by get_shared_waha_service()
+SHARED_SERVICES_MAX = 32
+
+# Keep idle pooled sockets alive so NAT/load balancers don't silently drop them
+_KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 30), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)  # Linux-specific options
+]
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections enable TCP keep-alive probes"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + _KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
 
 class SessionStatus(Enum):
     """WAHA Session Status"""
@@ -58,6 +118,23 @@ class WAHAConfig:
     timeout: int = 30
     webhook_url: Optional[str] = None
     webhook_events: Optional[List[str]] = None
+    # Seconds a fetched session status is reused (0 disables caching)
+    status_ttl: float = 5.0
+
+
+def _with_session(func):
+    """Default the method's session_name argument (positional or keyword) to self.session"""
+    index = list(inspect.signature(func).parameters).index('session_name') - 1
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if len(args) > index:
+            if not args[index]:
+                args = args[:index] + (self.session,) + args[index + 1:]
+        elif not kwargs.get('session_name'):
+            kwargs['session_name'] = self.session
+        return func(self, *args, **kwargs)
+    return wrapper
 
 
 class WAHAService:
@@ -82,17 +159,55 @@ class WAHAService:
         self.config = config
         self.api_url = config.api_url.rstrip('/')
         self.api_key = config.api_key
-        self.session = config.session
+        # Built once; the HTTP session and async clients send these on every request
+        self._headers = {
+            'Content-Type': 'application/json',
+            'X-Api-Key': self.api_key,
+        }
+        # Interned: copied into every request payload and used as a cache key
+        self.session = sys.intern(config.session)
         self.timeout = config.timeout
+        self._status_ttl = config.status_ttl
+        # Session name -> (fetched_at, session object) from get_session()
+        self._session_status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Shared HTTP session so keep-alive connections are reused across calls
+        self._http = requests.Session()
+        self._http.headers.update(self._headers)
+        adapter = KeepAliveHTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=RETRY_METHODS
+            )
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        # Same session without retries, for calls given an explicit time bound
+        self._http_no_retry = requests.Session()
+        self._http_no_retry.headers.update(self._headers)
+        adapter = KeepAliveHTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self._http_no_retry.mount('https://', adapter)
+        self._http_no_retry.mount('http://', adapter)
+
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self._http.close()
+        self._http_no_retry.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _get_headers(self) -> Dict[str, str]:
         """Get common headers for API requests"""
-        return {
-            'Content-Type': 'application/json',
-            'X-Api-Key': self.api_key,
-        }
+        return dict(self._headers)
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None, parse: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Make HTTP request to WAHA API
         
@@ -101,6 +216,10 @@ class WAHAService:
             endpoint: API endpoint (without base URL)
             data: Request body data
             params: Query parameters
+            parse: Decode the response body; when False a successful call
+                   returns {'status': 'success'} without parsing it
+            timeout: Bounds this call (seconds): overrides the configured
+                     timeout and disables retries, so the limit really holds
             
         Returns:
             Response data as dictionary
@@ -109,49 +228,91 @@ class WAHAService:
             WAHAAPIError: If request fails
         """
         url = f"{self.api_url}{endpoint}"
+        if timeout is None:
+            http = self._http
+            timeouts = (CONNECT_TIMEOUT, self.timeout)
+        else:
+            http = self._http_no_retry
+            timeouts = (min(CONNECT_TIMEOUT, timeout), timeout)
         
         try:
-            response = requests.request(
+            response = http.request(
                 method=method,
                 url=url,
-                json=data,
+                data=_json_dumps(data) if data is not None else None,
                 params=params,
-                headers=self._get_headers(),
-                timeout=self.timeout
+                timeout=timeouts
             )
             response.raise_for_status()
             
             # Some endpoints return empty response
-            if response.text:
-                return response.json()
+            if parse and response.content:
+                return _json_loads(response.content)
             return {'status': 'success'}
             
         except requests.exceptions.HTTPError as e:
-            error_msg = str(e)
-            try:
-                error_data = e.response.json()
-                error_msg = error_data.get('message', error_data.get('error', str(e)))
-            except:
-                pass
+            error_msg = self._error_message(e.response, str(e))
             _logger.error(f'WAHA API Error: {error_msg}')
             raise WAHAAPIError(error_msg)
         except requests.exceptions.RequestException as e:
             _logger.error(f'WAHA Request Error: {e}')
             raise WAHAAPIError(str(e))
+        except ValueError as e:
+            _logger.error(f'WAHA Invalid Response: {e}')
+            raise WAHAAPIError(f'Invalid JSON response: {e}')
+
+    @staticmethod
+    def _error_message(response, default: str) -> str:
+        """Extract the error message from a WAHA error response"""
+        if response is None:
+            return default
+        # Only parse bodies that claim to be JSON; HTML error pages are common
+        content_type = response.headers.get('Content-Type', '')
+        if 'json' in content_type and response.content:
+            try:
+                error_data = _json_loads(response.content)
+            except ValueError:
+                return response.text[:512] or default
+            if isinstance(error_data, dict):
+                return error_data.get('message', error_data.get('error', default))
+            return default
+        return response.text[:512] or default
+
+    def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a prepared request body to a WAHA endpoint
+        
+        Used to deliver requests queued by the WAHA outbox.
+        
+        Args:
+            endpoint: API endpoint (e.g. '/api/sendText')
+            data: Request body
+            
+        Returns:
+            Response data as dictionary
+            
+        Raises:
+            WAHAAPIError: If request fails
+        """
+        return self._make_request('POST', endpoint, data=data)
 
     # ==================== Session Management ====================
 
-    def list_sessions(self) -> List[Dict[str, Any]]:
+    def list_sessions(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         List all WAHA sessions
         
         Endpoint: GET /api/sessions
         
+        Args:
+            timeout: Bounds the request (seconds), without retries
+            
         Returns:
             List of session objects
         """
-        return self._make_request('GET', '/api/sessions')
+        return self._make_request('GET', '/api/sessions', timeout=timeout)
 
+    @_with_session
     def create_session(self, session_name: Optional[str] = None, start: bool = True, config: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Create a new WAHA session
@@ -166,8 +327,6 @@ class WAHAService:
         Returns:
             Created session object
         """
-        session_name = session_name or self.session
-        
         payload = {
             'name': session_name,
             'start': start,
@@ -188,9 +347,10 @@ class WAHAService:
         if config:
             payload['config'] = {**payload.get('config', {}), **config}
         
-        return self._make_request('POST', '/api/sessions', data=payload)
+        return self._session_request(session_name, 'POST', '/api/sessions', data=payload)
 
-    def get_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
+    @_with_session
+    def get_session(self, session_name: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Get session information
         
@@ -198,13 +358,38 @@ class WAHAService:
         
         Args:
             session_name: Session name
+            timeout: Bounds the request (seconds), without retries
             
         Returns:
             Session object with status
         """
-        session_name = session_name or self.session
-        return self._make_request('GET', f'/api/sessions/{session_name}')
+        cached = self._session_status_cache.get(session_name)
+        if cached is not None and time.monotonic() - cached[0] < self._status_ttl:
+            return dict(cached[1])
+        
+        session = self._make_request('GET', f'/api/sessions/{session_name}', timeout=timeout)
+        if self._status_ttl > 0:
+            self._session_status_cache[session_name] = (time.monotonic(), session)
+        return dict(session)
+
+    def _session_request(self, session_name: str, method: str, endpoint: str, **kwargs) -> Any:
+        """_make_request for calls that change a session's state, dropping its cached status"""
+        try:
+            return self._make_request(method, endpoint, **kwargs)
+        finally:
+            self.invalidate_session_status(session_name)
 
+    @_with_session
+    def invalidate_session_status(self, session_name: Optional[str] = None) -> None:
+        """
+        Drop the cached get_session() result
+        
+        Args:
+            session_name: Session name (default: self.session)
+        """
+        self._session_status_cache.pop(session_name, None)
+
+    @_with_session
     def update_session(self, session_name: Optional[str] = None, config: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Update session configuration
@@ -218,10 +403,10 @@ class WAHAService:
         Returns:
             Updated session object
         """
-        session_name = session_name or self.session
         payload = {'config': config} if config else {}
-        return self._make_request('PUT', f'/api/sessions/{session_name}', data=payload)
+        return self._session_request(session_name, 'PUT', f'/api/sessions/{session_name}', data=payload)
 
+    @_with_session
     def delete_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Delete a session
@@ -234,9 +419,9 @@ class WAHAService:
         Returns:
             Deletion status
         """
-        session_name = session_name or self.session
-        return self._make_request('DELETE', f'/api/sessions/{session_name}')
+        return self._session_request(session_name, 'DELETE', f'/api/sessions/{session_name}')
 
+    @_with_session
     def start_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Start a session
@@ -249,9 +434,9 @@ class WAHAService:
         Returns:
             Session status
         """
-        session_name = session_name or self.session
-        return self._make_request('POST', f'/api/sessions/{session_name}/start')
+        return self._session_request(session_name, 'POST', f'/api/sessions/{session_name}/start')
 
+    @_with_session
     def stop_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Stop a session
@@ -264,9 +449,9 @@ class WAHAService:
         Returns:
             Session status
         """
-        session_name = session_name or self.session
-        return self._make_request('POST', f'/api/sessions/{session_name}/stop')
+        return self._session_request(session_name, 'POST', f'/api/sessions/{session_name}/stop')
 
+    @_with_session
     def restart_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Restart a session
@@ -279,9 +464,9 @@ class WAHAService:
         Returns:
             Session status
         """
-        session_name = session_name or self.session
-        return self._make_request('POST', f'/api/sessions/{session_name}/restart')
+        return self._session_request(session_name, 'POST', f'/api/sessions/{session_name}/restart')
 
+    @_with_session
     def logout_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Logout from session (disconnect WhatsApp)
@@ -294,9 +479,9 @@ class WAHAService:
         Returns:
             Logout status
         """
-        session_name = session_name or self.session
-        return self._make_request('POST', f'/api/sessions/{session_name}/logout')
+        return self._session_request(session_name, 'POST', f'/api/sessions/{session_name}/logout')
 
+    @_with_session
     def get_session_me(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Get authenticated account information
@@ -309,11 +494,11 @@ class WAHAService:
         Returns:
             Account information (phone number, name, etc.)
         """
-        session_name = session_name or self.session
         return self._make_request('GET', f'/api/sessions/{session_name}/me')
 
     # ==================== Authentication ====================
 
+    @_with_session
     def get_qr_code(self, session_name: Optional[str] = None, format: str = 'image') -> Dict[str, Any]:
         """
         Get QR code for WhatsApp pairing
@@ -327,10 +512,10 @@ class WAHAService:
         Returns:
             QR code data (base64 image or raw value)
         """
-        session_name = session_name or self.session
         params = {'format': format}
         return self._make_request('GET', f'/api/{session_name}/auth/qr', params=params)
 
+    @_with_session
     def request_auth_code(self, phone_number: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Request authentication code via phone number
@@ -344,12 +529,12 @@ class WAHAService:
         Returns:
             Request status
         """
-        session_name = session_name or self.session
         payload = {'phoneNumber': phone_number}
         return self._make_request('POST', f'/api/{session_name}/auth/request-code', data=payload)
 
     # ==================== Messaging ====================
 
+    @_with_session
     def send_text(self, chat_id: str, text: str, session_name: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
         Send text message
@@ -365,8 +550,12 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
+        payload = self._text_payload(chat_id, text, session_name, **kwargs)
+        return self._make_request('POST', '/api/sendText', data=payload)
+
+    @staticmethod
+    def _text_payload(chat_id: str, text: str, session_name: str, **kwargs) -> Dict[str, Any]:
+        """Build the /api/sendText request body"""
         payload = {
             'chatId': chat_id,
             'text': text,
@@ -378,8 +567,109 @@ class WAHAService:
         if kwargs.get('link_preview', True):
             payload['linkPreview'] = True
         
-        return self._make_request('POST', '/api/sendText', data=payload)
+        return payload
+
+    @_with_session
+    def enqueue_send_text(self, outbox, chat_id: str, text: str, session_name: Optional[str] = None, notification=None, **kwargs):
+        """
+        Queue a text message for background delivery instead of sending it inline
+        
+        Args:
+            outbox: shuttle.waha.outbox model (e.g. env['shuttle.waha.outbox'])
+            chat_id: Chat ID (phone@c.us or group@g.us)
+            text: Message text
+            session_name: Session name
+            notification: shuttle.notification to mark sent/failed on delivery
+            **kwargs: Additional options (see send_text)
+            
+        Returns:
+            The created outbox record
+        """
+        payload = self._text_payload(chat_id, text, session_name, **kwargs)
+        return outbox.enqueue('/api/sendText', payload, notification=notification)
+
+    def send_text_many(self, messages: List[Tuple[str, str]], session_name: Optional[str] = None, concurrency: int = 10, **kwargs) -> List[Union[Dict[str, Any], 'WAHAAPIError']]:
+        """
+        Send many text messages concurrently (e.g. notify a whole passenger group)
+        
+        Synchronous wrapper around send_text_many_async(); must not be called
+        from a running event loop.
+        
+        Args:
+            messages: List of (chat_id, text) tuples
+            session_name: Session name
+            concurrency: Maximum number of requests in flight
+            **kwargs: Options applied to every message (see send_text)
+            
+        Returns:
+            One entry per message, in order: the message response, or the
+            WAHAAPIError raised for that message
+        """
+        return asyncio.run(self.send_text_many_async(messages, session_name, concurrency, **kwargs))
+
+    @_with_session
+    async def send_text_many_async(self, messages: List[Tuple[str, str]], session_name: Optional[str] = None, concurrency: int = 10, **kwargs) -> List[Union[Dict[str, Any], 'WAHAAPIError']]:
+        """
+        Async variant of send_text_many()
+        
+        With httpx installed the messages are multiplexed over one client
+        (HTTP/2 when the h2 package is available); otherwise they are sent
+        through the pooled sync session from worker threads.
+        """
+        payloads = [self._text_payload(chat_id, text, session_name, **kwargs) for chat_id, text in messages]
+        if not payloads:
+            return []
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        if not HTTPX_AVAILABLE:
+            async def send(payload):
+                async with semaphore:
+                    return await asyncio.to_thread(self._make_request, 'POST', '/api/sendText', payload)
+            
+            return list(await asyncio.gather(*(send(p) for p in payloads), return_exceptions=True))
+        
+        async with self._async_client() as client:
+            async def send(payload):
+                async with semaphore:
+                    return await self._post_async(client, '/api/sendText', payload)
+            
+            return list(await asyncio.gather(*(send(p) for p in payloads), return_exceptions=True))
+
+    def _async_client(self):
+        """New httpx.AsyncClient for the WAHA API (HTTP/2 when h2 is installed)"""
+        options = {
+            'base_url': self.api_url,
+            'headers': self._headers,
+            'timeout': httpx.Timeout(self.timeout, connect=CONNECT_TIMEOUT),
+            'limits': httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        }
+        try:
+            return httpx.AsyncClient(http2=True, **options)
+        except ImportError:
+            return httpx.AsyncClient(**options)
+
+    async def _post_async(self, client, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of _make_request('POST', ...) over an httpx client"""
+        try:
+            response = await client.post(endpoint, content=_json_dumps(data))
+        except httpx.HTTPError as e:
+            _logger.error(f'WAHA Request Error: {e}')
+            raise WAHAAPIError(str(e))
+        
+        if response.is_error:
+            error_msg = self._error_message(response, f'HTTP {response.status_code}')
+            _logger.error(f'WAHA API Error: {error_msg}')
+            raise WAHAAPIError(error_msg)
+        
+        if response.content:
+            try:
+                return _json_loads(response.content)
+            except ValueError as e:
+                raise WAHAAPIError(f'Invalid JSON response: {e}')
+        return {'status': 'success'}
 
+    @_with_session
     def send_image(self, chat_id: str, image_url: str, caption: str = '', session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send image message
@@ -395,8 +685,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'file': {'url': image_url},
@@ -406,6 +694,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendImage', data=payload)
 
+    @_with_session
     def send_file(self, chat_id: str, file_url: str, filename: str = '', caption: str = '', session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send file/document
@@ -422,8 +711,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'file': {'url': file_url},
@@ -437,6 +724,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendFile', data=payload)
 
+    @_with_session
     def send_voice(self, chat_id: str, voice_url: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send voice message
@@ -451,8 +739,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'file': {'url': voice_url},
@@ -461,6 +747,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendVoice', data=payload)
 
+    @_with_session
     def send_video(self, chat_id: str, video_url: str, caption: str = '', session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send video message
@@ -476,8 +763,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'file': {'url': video_url},
@@ -487,6 +772,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendVideo', data=payload)
 
+    @_with_session
     def send_location(self, chat_id: str, latitude: float, longitude: float, name: str = '', address: str = '', session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send location
@@ -504,8 +790,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'latitude': latitude,
@@ -520,6 +804,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendLocation', data=payload)
 
+    @_with_session
     def send_contact_vcard(self, chat_id: str, vcard: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send contact vCard
@@ -534,8 +819,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'vcard': vcard,
@@ -544,6 +827,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendContactVcard', data=payload)
 
+    @_with_session
     def send_poll(self, chat_id: str, name: str, options: List[str], multiple_answers: bool = False, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send poll
@@ -560,8 +844,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'name': name,
@@ -572,6 +854,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendPoll', data=payload)
 
+    @_with_session
     def send_list(self, chat_id: str, title: str, description: str, button_text: str, sections: List[Dict], session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Send interactive list message
@@ -589,8 +872,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'title': title,
@@ -602,6 +883,7 @@ class WAHAService:
         
         return self._make_request('POST', '/api/sendList', data=payload)
 
+    @_with_session
     def forward_message(self, chat_id: str, message_id: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Forward a message
@@ -616,8 +898,6 @@ class WAHAService:
         Returns:
             Message response with ID
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'messageId': message_id,
@@ -628,6 +908,7 @@ class WAHAService:
 
     # ==================== Chat Actions ====================
 
+    @_with_session
     def send_seen(self, chat_id: str, message_id: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Mark message as seen
@@ -642,16 +923,15 @@ class WAHAService:
         Returns:
             Status response
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'messageId': message_id,
             'session': session_name,
         }
         
-        return self._make_request('POST', '/api/sendSeen', data=payload)
+        return self._make_request('POST', '/api/sendSeen', data=payload, parse=False)
 
+    @_with_session
     def start_typing(self, chat_id: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Start typing indicator
@@ -665,15 +945,14 @@ class WAHAService:
         Returns:
             Status response
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'session': session_name,
         }
         
-        return self._make_request('POST', '/api/startTyping', data=payload)
+        return self._make_request('POST', '/api/startTyping', data=payload, parse=False)
 
+    @_with_session
     def stop_typing(self, chat_id: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Stop typing indicator
@@ -687,15 +966,14 @@ class WAHAService:
         Returns:
             Status response
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'session': session_name,
         }
         
-        return self._make_request('POST', '/api/stopTyping', data=payload)
+        return self._make_request('POST', '/api/stopTyping', data=payload, parse=False)
 
+    @_with_session
     def react_to_message(self, chat_id: str, message_id: str, reaction: str, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         React to a message with emoji
@@ -711,8 +989,6 @@ class WAHAService:
         Returns:
             Status response
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'messageId': message_id,
@@ -722,6 +998,7 @@ class WAHAService:
         
         return self._make_request('PUT', '/api/reaction', data=payload)
 
+    @_with_session
     def star_message(self, chat_id: str, message_id: str, star: bool = True, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Star or unstar a message
@@ -737,8 +1014,6 @@ class WAHAService:
         Returns:
             Status response
         """
-        session_name = session_name or self.session
-        
         payload = {
             'chatId': chat_id,
             'messageId': message_id,
@@ -760,8 +1035,7 @@ class WAHAService:
         Returns:
             Chat ID in format: {phone}@c.us
         """
-        clean_phone = ''.join(filter(str.isdigit, phone))
-        return f"{clean_phone}@c.us"
+        return _phone_to_chat_id(phone)
 
     def is_session_ready(self, session_name: Optional[str] = None) -> bool:
         """
@@ -780,6 +1054,7 @@ class WAHAService:
         except:
             return False
 
+    @_with_session
     def ensure_session_ready(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Ensure session exists and is ready, create if needed
@@ -790,8 +1065,6 @@ class WAHAService:
         Returns:
             Session status
         """
-        session_name = session_name or self.session
-        
         try:
             session = self.get_session(session_name)
             status = session.get('status') or session.get('engine', {}).get('status')
@@ -808,6 +1081,16 @@ class WAHAService:
             return self.create_session(session_name, start=True)
 
 
+@lru_cache(maxsize=4096)
+def _phone_to_chat_id(phone: str) -> str:
+    """Digits of phone as a WAHA chat ID (the same numbers recur across sends)"""
+    clean_phone = phone.translate(_NON_DIGITS_TABLE)
+    if not clean_phone.isdigit():
+        # Non-ASCII characters survive the table; keep only Unicode digits
+        clean_phone = ''.join(filter(str.isdigit, clean_phone))
+    return f"{clean_phone}@c.us"
+
+
 class WAHAAPIError(Exception):
     """Custom exception for WAHA API errors"""
     pass
@@ -837,3 +1120,51 @@ def create_waha_service(api_url: str, api_key: str, session: str = 'default', we
     )
     return WAHAService(config)
 
+
+# (api_url, session) -> ((api_key, webhook_url), service), least recently used first
+_SHARED_SERVICES: 'OrderedDict[Tuple[str, str], Tuple[Tuple[str, Optional[str]], WAHAService]]' = OrderedDict()
+_SHARED_SERVICES_LOCK = Lock()
+
+
+def get_shared_waha_service(api_url: str, api_key: str, session: str = 'default', webhook_url: str = None) -> WAHAService:
+    """
+    WAHAService shared per (api_url, session)
+    
+    Reusing the instance keeps its pooled HTTP connections and its short
+    get_session() status cache warm across calls. Callers must not close it.
+    A service is closed when its API key or webhook URL changes, or when it
+    is evicted past SHARED_SERVICES_MAX entries.
+    
+    Args:
+        api_url: WAHA API URL
+        api_key: WAHA API key
+        session: Session name
+        webhook_url: Webhook URL for events
+        
+    Returns:
+        Shared WAHAService instance
+    """
+    slot = (api_url, session)
+    settings = (api_key, webhook_url)
+    stale = []
+    with _SHARED_SERVICES_LOCK:
+        entry = _SHARED_SERVICES.get(slot)
+        if entry is not None and entry[0] == settings:
+            _SHARED_SERVICES.move_to_end(slot)
+            return entry[1]
+        if entry is not None:
+            stale.append(entry[1])
+        service = create_waha_service(
+            api_url=api_url,
+            api_key=api_key,
+            session=session,
+            webhook_url=webhook_url
+        )
+        _SHARED_SERVICES[slot] = (settings, service)
+        _SHARED_SERVICES.move_to_end(slot)
+        while len(_SHARED_SERVICES) > SHARED_SERVICES_MAX:
+            stale.append(_SHARED_SERVICES.popitem(last=False)[1][1])
+    # Calls still running on a closed service finish; its sockets are then dropped
+    for old_service in stale:
+        old_service.close()
+    return service
@@ -1,34 +1,71 @@
 # -*- coding: utf-8 -*-
 
 from odoo import api, SUPERUSER_ID
+from odoo.tools import split_every
+
+# Passenger group lines recomputed (and committed) per batch
+LOCATION_DISPLAY_BATCH_SIZE = 1000
+
+# XML id given to the multi-company rule created below
+GPS_POSITION_RULE_XMLID = 'shuttlebee.gps_position_multi_company_rule'
+GPS_POSITION_DOMAIN = "[('company_id', 'in', company_ids)]"
+
+
+def _setup_gps_position_security(env, model, group, rule, groups, access_rights):
+    """(Re)create the GPS position multi-company rule and access rights"""
+    if not rule:
+        # Rules created before the XML id existed
+        env['ir.rule'].search([
+            ('name', '=', 'GPS Position: Multi-Company'),
+            ('model_id', '=', model.id)
+        ]).unlink()
+    
+    if group:
+        rule_vals = {
+            'name': 'GPS Position: Multi-Company',
+            'model_id': model.id,
+            'domain_force': GPS_POSITION_DOMAIN,
+            'groups': [(4, group.id)],
+        }
+        if rule:
+            rule.write(rule_vals)
+        else:
+            rule = env['ir.rule'].create(rule_vals)
+            env['ir.model.data']._update_xmlids([{
+                'xml_id': GPS_POSITION_RULE_XMLID,
+                'record': rule,
+                'noupdate': True,
+            }])
+    elif rule:
+        rule.unlink()
+    
+    # Replace existing access rows in one search/unlink and one batch create
+    env['ir.model.access'].search([
+        ('name', 'in', [f'shuttle.gps.position.{role}' for role, *_perms in access_rights]),
+        ('model_id', '=', model.id)
+    ]).unlink()
+    
+    env['ir.model.access'].create([{
+        'name': f'shuttle.gps.position.{role}',
+        'model_id': model.id,
+        'group_id': groups[role].id,
+        'perm_read': read,
+        'perm_write': write,
+        'perm_create': create,
+        'perm_unlink': unlink,
+    } for role, read, write, create, unlink in access_rights if groups.get(role)])
 
 
 def post_init_hook(env):
     """Create GPS position multi-company rule and access rights after models are loaded"""
     
-    # Find the model
-    model = env['ir.model'].search([
-        ('model', '=', 'shuttle.gps.position')
-    ], limit=1)
+    # Find the model (served from the registry's ir.model cache)
+    model = env['ir.model']._get('shuttle.gps.position')
     
     if model:
-        # Remove existing rule if any
-        env['ir.rule'].search([
-            ('name', '=', 'GPS Position: Multi-Company'),
-            ('model_id', '=', model.id)
-        ]).unlink()
-        
-        # Create the rule
         group = env.ref('base.group_multi_company', raise_if_not_found=False)
-        if group:
-            env['ir.rule'].create({
-                'name': 'GPS Position: Multi-Company',
-                'model_id': model.id,
-                'domain_force': "[('company_id', 'in', company_ids)]",
-                'groups': [(4, group.id)],
-            })
+        rule = env.ref(GPS_POSITION_RULE_XMLID, raise_if_not_found=False)
         
-        # Create access rights
         groups = {
             'user': env.ref('shuttlebee.group_shuttle_user', raise_if_not_found=False),
             'driver': env.ref('shuttlebee.group_shuttle_driver', raise_if_not_found=False),
@@ -43,37 +80,37 @@ def post_init_hook(env):
             ('manager', True, True, True, True),
         ]
         
-        for role, read, write, create, unlink in access_rights:
-            group = groups.get(role)
-            if group:
-                # Remove existing access if any
-                env['ir.model.access'].search([
-                    ('name', '=', f'shuttle.gps.position.{role}'),
-                    ('model_id', '=', model.id),
-                    ('group_id', '=', group.id)
-                ]).unlink()
-                
-                # Create access right
-                env['ir.model.access'].create({
-                    'name': f'shuttle.gps.position.{role}',
-                    'model_id': model.id,
-                    'group_id': group.id,
-                    'perm_read': read,
-                    'perm_write': write,
-                    'perm_create': create,
-                    'perm_unlink': unlink,
-                })
+        _setup_gps_position_security(env, model, group, rule, groups, access_rights)
     
-    # Auto-assign ShuttleBee groups to existing users
-    users = env['res.users'].search([('active', '=', True)])
+    # Auto-assign ShuttleBee groups to existing users that have none yet
+    shuttle_group_ids = [
+        group.id for group in (
+            env.ref(f'shuttlebee.group_shuttle_{role}', raise_if_not_found=False)
+            for role in ('user', 'driver', 'dispatcher', 'manager')
+        ) if group
+    ]
+    users = env['res.users'].search([
+        ('active', '=', True),
+        ('groups_id', 'not in', shuttle_group_ids),
+    ])
     if users:
         users._auto_assign_shuttle_groups()
     
     # Recompute location displays for all passenger group lines
+    line_count = env['shuttle.passenger.group.line'].search_count([])
+    if line_count <= LOCATION_DISPLAY_BATCH_SIZE:
+        # Small enough for the install transaction itself
+        if line_count:
+            env['shuttle.passenger.group.line'].search([])._compute_location_displays()
+        return
+    
+    # Large databases: separate cursor, committed batch by batch
     with env.registry.cursor() as cr:
         env_cr = api.Environment(cr, SUPERUSER_ID, {})
-        lines = env_cr['shuttle.passenger.group.line'].search([])
-        if lines:
-            lines._compute_location_displays()
+        Line = env_cr['shuttle.passenger.group.line']
+        for batch in split_every(LOCATION_DISPLAY_BATCH_SIZE, Line.search([]).ids, Line.browse):
+            batch._compute_location_displays()
             cr.commit()
+            # Keep the cache bounded to one batch
+            env_cr.invalidate_all()
 
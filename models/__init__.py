@@ -3,20 +3,26 @@
 # Import helpers first
 from .. import helpers
 
-from . import shuttle_trip
-from . import shuttle_trip_line
-from . import shuttle_stop
+# Extensions of base models
 from . import res_partner
 from . import res_users
-from . import shuttle_notification
+from . import res_company
 from . import res_config_settings
+
+# Core shuttle models
+from . import shuttle_stop
+from . import shuttle_vehicle
+from . import shuttle_trip
+from . import shuttle_trip_line
+from . import shuttle_holiday
 from . import shuttle_passenger_group
 from . import shuttle_passenger_group_schedule
 from . import shuttle_passenger_group_holiday
-from . import shuttle_holiday
-from . import shuttle_vehicle
+
+# Models depending on the core ones
 from . import shuttle_vehicle_position
-from . import shuttle_config_helper
 from . import shuttle_gps_position
-from . import res_company
+from . import shuttle_notification
 from . import shuttle_message_template
+from . import shuttle_config_helper
+from . import shuttle_waha_outbox
@@ -21,6 +21,11 @@ class ResCompany(models.Model):
     shuttle_schedule_timezone = fields.Char(
         string='Shuttle Schedule Timezone',
         help='Default timezone used to interpret shuttle schedules when creating trips.',
-        default=lambda self: self.env.user.tz or 'UTC'
+        default='UTC'
     )
 
+    def action_use_my_timezone(self):
+        """Set the shuttle schedule timezone to the current user's timezone"""
+        self.write({'shuttle_schedule_timezone': self.env.user.tz or 'UTC'})
+        return True
+
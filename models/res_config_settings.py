@@ -1,11 +1,105 @@
 # -*- coding: utf-8 -*-
 
+import functools
 import logging
-from odoo import api, fields, models, _
+import sys
+from collections import defaultdict
+from datetime import timedelta
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError, UserError
 
+from ..helpers.waha_service import get_shared_waha_service
+
 _logger = logging.getLogger(__name__)
 
+# Seconds a status refresh may wait on WAHA before reporting an error
+WAHA_STATUS_TIMEOUT = 2
+# Labels shown for WAHA session statuses
+WAHA_STATUS_LABELS = {
+    'WORKING': '✅ يعمل',
+    'STOPPED': '⏹️ متوقف',
+    'STARTING': '🔄 يبدأ...',
+    'SCAN_QR_CODE': '📱 يحتاج QR Code',
+    'FAILED': '❌ فشل',
+}
+# Age after which a user's other settings rows are dropped on save; younger
+# rows may still be open in another tab
+STALE_SETTINGS_MINUTES = 15
+
+# Per-company settings stored as 'shuttlebee.<name>' parameters, with their defaults
+_SHUTTLEBEE_PARAMS = (
+    ('notification_channel', 'sms'),
+    ('approaching_minutes', 10),
+    ('absent_timeout', 5),
+    ('auto_confirm_minutes_before_start', 60),
+    ('sms_api_url', ''),
+    ('sms_api_key', ''),
+    ('whatsapp_provider_type', 'waha_whatsapp'),
+    ('whatsapp_api_url', ''),
+    ('whatsapp_api_key', ''),
+    ('waha_session', 'default'),
+    ('waha_webhook_url', ''),
+    ('waha_async_delivery', False),
+    ('template_approaching', ''),
+    ('template_arrived', ''),
+    ('route_optimizer_url', 'https://route-optimizer.geniura.com/optimize'),
+    ('route_optimizer_timeout', 60),
+    ('route_optimizer_speed_kmh', 40.0),
+    ('route_optimizer_max_time', 30),
+)
+# Only shown, loaded and saved when WAHA is the WhatsApp provider
+_WAHA_PARAMS = frozenset({'waha_session', 'waha_webhook_url', 'waha_async_delivery'})
+_WAHA_FIELDS = frozenset(f'shuttlebee_{name}' for name in _WAHA_PARAMS)
+# (field name, parameter key, default), built once at import
+_PARAM_SPECS = tuple(
+    (f'shuttlebee_{name}', sys.intern(f'shuttlebee.{name}'), default)
+    for name, default in _SHUTTLEBEE_PARAMS
+)
+_PARAM_SPECS_NO_WAHA = tuple(
+    spec for spec, (name, _default) in zip(_PARAM_SPECS, _SHUTTLEBEE_PARAMS)
+    if name not in _WAHA_PARAMS
+)
+
+
+def _visible_params(provider_type):
+    """_PARAM_SPECS entries relevant to the given WhatsApp provider"""
+    if provider_type == 'waha_whatsapp':
+        return _PARAM_SPECS
+    return _PARAM_SPECS_NO_WAHA
+
+
+@functools.lru_cache(maxsize=64)
+def _company_write_specs(provider_type, company_id):
+    """(field name, global key, company key, default) written by set_values, built once per company"""
+    suffix = f'.company_{company_id}'
+    return tuple(
+        (field, key, sys.intern(key + suffix), default)
+        for field, key, default in _visible_params(provider_type)
+    )
+
+
+def _company_id(env, company):
+    """Id of a company given as record or id, defaulting to env.company"""
+    if isinstance(company, int):
+        return company
+    return (company or env.company).id
+
+
+def _format_param(value):
+    """String stored for a settings field value; unset values are stored empty"""
+    if value is False or value is None:
+        return ''
+    return str(value)
+
+
+def _parse_param(value, default):
+    """Convert a stored parameter string to the type of its default"""
+    if isinstance(default, bool):
+        return str(value).lower() in ('1', 'true', 'yes')
+    if isinstance(default, (int, float)):
+        return type(default)(value or default)
+    return value
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
@@ -17,23 +111,19 @@ class ResConfigSettings(models.TransientModel):
         ('push', 'Push Notification'),
         ('email', 'Email')
     ], string='Default Notification Channel',
-       config_parameter='shuttlebee.notification_channel',
        default='sms')
 
     # Timing Settings
     shuttlebee_approaching_minutes = fields.Integer(
         string='Send "Approaching" Notification (Minutes Before)',
-        config_parameter='shuttlebee.approaching_minutes',
         default=10
     )
     shuttlebee_absent_timeout = fields.Integer(
         string='Mark Absent After (Minutes)',
-        config_parameter='shuttlebee.absent_timeout',
         default=5
     )
     shuttlebee_auto_confirm_minutes_before_start = fields.Integer(
         string='Auto Confirm Trips (Minutes Before Start)',
-        config_parameter='shuttlebee.auto_confirm_minutes_before_start',
         default=60,
         help='Automatically confirm Draft trips this many minutes before planned start.'
     )
@@ -45,15 +135,15 @@ class ResConfigSettings(models.TransientModel):
         default=lambda self: self.env.company,
         required=True
     )
+    # Whether get_values loaded the WAHA-only settings into this form
+    shuttlebee_waha_params_loaded = fields.Boolean(string='WAHA Settings Loaded')
 
     # API Settings
     shuttlebee_sms_api_url = fields.Char(
-        string='SMS API URL',
-        config_parameter='shuttlebee.sms_api_url'
+        string='SMS API URL'
     )
     shuttlebee_sms_api_key = fields.Char(
-        string='SMS API Key',
-        config_parameter='shuttlebee.sms_api_key'
+        string='SMS API Key'
     )
     
     # WhatsApp Provider Selection
@@ -62,146 +152,219 @@ class ResConfigSettings(models.TransientModel):
         ('whatsapp_business', 'WhatsApp Business API'),
         ('generic_whatsapp', 'Generic WhatsApp API'),
     ], string='WhatsApp Provider',
-       config_parameter='shuttlebee.whatsapp_provider_type',
        default='waha_whatsapp')
     
     shuttlebee_whatsapp_api_url = fields.Char(
         string='WhatsApp API URL',
-        config_parameter='shuttlebee.whatsapp_api_url',
         help='For WAHA: http://your-server:3000'
     )
     shuttlebee_whatsapp_api_key = fields.Char(
         string='WhatsApp API Key',
-        config_parameter='shuttlebee.whatsapp_api_key',
         help='For WAHA: Your WAHA_API_KEY'
     )
     
     # WAHA Specific Settings
     shuttlebee_waha_session = fields.Char(
         string='WAHA Session Name',
-        config_parameter='shuttlebee.waha_session',
         default='default',
         help='Name of the WAHA session to use'
     )
     shuttlebee_waha_webhook_url = fields.Char(
         string='WAHA Webhook URL',
-        config_parameter='shuttlebee.waha_webhook_url',
         help='URL for WAHA to send webhook events (e.g., https://your-odoo.com/shuttlebee/webhook/waha)'
     )
+    shuttlebee_waha_async_delivery = fields.Boolean(
+        string='Queue WAHA Messages',
+        help='Store outgoing WhatsApp notifications in an outbox delivered by a background job '
+             'instead of calling WAHA while the notification is being sent'
+    )
     shuttlebee_waha_session_status = fields.Char(
         string='WAHA Session Status',
         compute='_compute_waha_session_status',
+        compute_sudo=True,
         readonly=True
     )
 
     # Message Templates
     shuttlebee_template_approaching = fields.Char(
         string='Approaching Message Template',
-        config_parameter='shuttlebee.template_approaching',
         default='مرحباً {passenger_name}، السائق {driver_name} يقترب من نقطة التجمع {stop_name}. الوصول المتوقع: {eta} دقائق.'
     )
     shuttlebee_template_arrived = fields.Char(
         string='Arrived Message Template',
-        config_parameter='shuttlebee.template_arrived',
         default='السائق {driver_name} وصل إلى {stop_name}. يرجى التوجه للحافلة.'
     )
     
     # Route Optimizer Settings
     shuttlebee_route_optimizer_url = fields.Char(
         string='Route Optimizer API URL',
-        config_parameter='shuttlebee.route_optimizer_url',
         default='https://route-optimizer.geniura.com/optimize',
         help='URL for the Route Optimizer API endpoint (e.g., https://route-optimizer.geniura.com/optimize)'
     )
     shuttlebee_route_optimizer_timeout = fields.Integer(
         string='Route Optimizer Timeout (seconds)',
-        config_parameter='shuttlebee.route_optimizer_timeout',
         default=60,
         help='Maximum time to wait for route optimization response'
     )
     shuttlebee_route_optimizer_speed_kmh = fields.Float(
         string='Average Speed (km/h)',
-        config_parameter='shuttlebee.route_optimizer_speed_kmh',
         default=40.0,
         help='Average vehicle speed used for time estimation'
     )
     shuttlebee_route_optimizer_max_time = fields.Integer(
         string='Max Optimization Time (seconds)',
-        config_parameter='shuttlebee.route_optimizer_max_time',
         default=30,
         help='Maximum time for the optimizer to find a solution'
     )
 
     def set_values(self):
         super().set_values()
-        company = self.shuttlebee_company_id or self.env.company
-        company_id = company.id
-
-        params = self.env['ir.config_parameter'].sudo()
-        if company:
-            suffix = f'.company_{company_id}'
-        else:
-            suffix = ''
-
-        def _set_param(key, value):
-            params.set_param(f'{key}{suffix}', value or '')
-
-        _set_param('shuttlebee.notification_channel', self.shuttlebee_notification_channel)
-        _set_param('shuttlebee.approaching_minutes', self.shuttlebee_approaching_minutes)
-        _set_param('shuttlebee.absent_timeout', self.shuttlebee_absent_timeout)
-        _set_param('shuttlebee.auto_confirm_minutes_before_start', self.shuttlebee_auto_confirm_minutes_before_start)
-        _set_param('shuttlebee.sms_api_url', self.shuttlebee_sms_api_url)
-        _set_param('shuttlebee.sms_api_key', self.shuttlebee_sms_api_key)
-        _set_param('shuttlebee.whatsapp_provider_type', self.shuttlebee_whatsapp_provider_type)
-        _set_param('shuttlebee.whatsapp_api_url', self.shuttlebee_whatsapp_api_url)
-        _set_param('shuttlebee.whatsapp_api_key', self.shuttlebee_whatsapp_api_key)
-        _set_param('shuttlebee.waha_session', self.shuttlebee_waha_session)
-        _set_param('shuttlebee.waha_webhook_url', self.shuttlebee_waha_webhook_url)
-        _set_param('shuttlebee.template_approaching', self.shuttlebee_template_approaching)
-        _set_param('shuttlebee.template_arrived', self.shuttlebee_template_arrived)
-        _set_param('shuttlebee.route_optimizer_url', self.shuttlebee_route_optimizer_url)
-        _set_param('shuttlebee.route_optimizer_timeout', self.shuttlebee_route_optimizer_timeout)
-        _set_param('shuttlebee.route_optimizer_speed_kmh', self.shuttlebee_route_optimizer_speed_kmh)
-        _set_param('shuttlebee.route_optimizer_max_time', self.shuttlebee_route_optimizer_max_time)
+        company_id = (self.shuttlebee_company_id or self.env.company).id
+
+        # Hidden WAHA fields keep their stored values when another provider is
+        # selected. When switching to WAHA, the WAHA-only fields were not
+        # loaded into this form: only values the user actually entered are saved.
+        waha_loaded = self.shuttlebee_waha_params_loaded
+        values = {}
+        specs = _company_write_specs(self.shuttlebee_whatsapp_provider_type, company_id)
+        for field, key, company_key, default in specs:
+            value = _format_param(self[field])
+            if not waha_loaded and field in _WAHA_FIELDS and value == _format_param(default):
+                continue
+            # The global key is still read by code that is not company-aware
+            values[key] = value
+            values[company_key] = value
+        self._set_params(self.env, values)
+
+        # Trim this user's earlier settings rows instead of leaving them to the transient vacuum
+        self.search([
+            ('create_uid', '=', self.env.uid),
+            ('id', 'not in', self.ids),
+            ('create_date', '<', fields.Datetime.now() - timedelta(minutes=STALE_SETTINGS_MINUTES)),
+        ]).unlink()
+
+    @classmethod
+    def _set_params(cls, env, values):
+        """
+        Create or update several ir.config_parameter entries at once
+
+        All keys are written with a single INSERT ... ON CONFLICT statement;
+        rows whose value is unchanged are left untouched.
+
+        Args:
+            env: Odoo environment
+            values: Mapping of parameter key to value
+        """
+        rows = [(key, str(value), env.uid, env.uid) for key, value in values.items()]
+        env.cr.execute(
+            """
+            INSERT INTO ir_config_parameter (key, value, create_uid, write_uid, create_date, write_date)
+            SELECT v.key, v.value, v.create_uid, v.write_uid,
+                   now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM (VALUES %s) AS v(key, value, create_uid, write_uid)
+            ON CONFLICT (key) DO UPDATE
+               SET value = EXCLUDED.value,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+             WHERE ir_config_parameter.value IS DISTINCT FROM EXCLUDED.value
+            """ % ', '.join(['%s'] * len(rows)),
+            rows
+        )
+        # Raw SQL bypasses the ORM: drop cached records and get_param lookups
+        env['ir.config_parameter'].invalidate_model(['value'])
+        env.registry.clear_cache()
 
     @classmethod
     def _get_company_param(cls, env, key, company=None, default=False):
-        company = company or env.company
-        params = env['ir.config_parameter'].sudo()
-        suffix = f'.company_{company.id}'
-        value = params.get_param(f'{key}{suffix}')
-        if value is None:
-            value = params.get_param(key, default)
-        return value
+        return env['res.config.settings']._get_company_param_cached(
+            _company_id(env, company), key, default
+        )
+
+    @api.model
+    @tools.ormcache('company_id', 'key', 'default')
+    def _get_company_param_cached(self, company_id, key, default):
+        """
+        Resolve a company parameter, cached per (company_id, key, default)
+
+        ir.config_parameter clears the registry cache on every create/write/unlink,
+        so values saved through set_values are picked up immediately.
+        """
+        # Company override and global value in one round-trip, override first
+        suffixed = f'{key}.company_{company_id}'
+        self.env['ir.config_parameter'].flush_model(['key', 'value'])
+        self.env.cr.execute(
+            """
+            SELECT value FROM ir_config_parameter
+             WHERE key IN (%s, %s)
+             ORDER BY key = %s DESC
+             LIMIT 1
+            """,
+            (suffixed, key, suffixed)
+        )
+        row = self.env.cr.fetchone()
+        return row[0] if row else default
+
+    @classmethod
+    def _get_company_params(cls, env, defaults, company=None):
+        """
+        Resolve several company parameters with a single query
+
+        Args:
+            env: Odoo environment
+            defaults: Mapping of parameter key to default value
+            company: Company record or id whose overrides apply (default: env.company)
+
+        Returns:
+            dict: key -> company value, else global value, else default
+        """
+        suffix = f'.company_{_company_id(env, company)}'
+        keys = tuple(defaults)
+        suffixed = tuple(key + suffix for key in keys)
+        # Plain SELECT: no access checks, record prefetch or field conversion
+        env['ir.config_parameter'].flush_model(['key', 'value'])
+        env.cr.execute(
+            'SELECT key, value FROM ir_config_parameter WHERE key = ANY(%s)',
+            [list(keys + suffixed)]
+        )
+        by_key = dict(env.cr.fetchall())
+        values = {}
+        for key, suffixed_key in zip(keys, suffixed):
+            value = by_key.get(suffixed_key)
+            if value is None:
+                value = by_key.get(key, defaults[key])
+            values[key] = value
+        return values
 
     @api.model
     def get_values(self):
         res = super().get_values()
-        company = self.env.company
-        res.update({
-            'shuttlebee_company_id': company.id,
-            'shuttlebee_notification_channel': self._get_company_param(self.env, 'shuttlebee.notification_channel', company, 'sms'),
-            'shuttlebee_approaching_minutes': int(self._get_company_param(self.env, 'shuttlebee.approaching_minutes', company, 10)),
-            'shuttlebee_absent_timeout': int(self._get_company_param(self.env, 'shuttlebee.absent_timeout', company, 5)),
-            'shuttlebee_auto_confirm_minutes_before_start': int(self._get_company_param(self.env, 'shuttlebee.auto_confirm_minutes_before_start', company, 60) or 60),
-            'shuttlebee_sms_api_url': self._get_company_param(self.env, 'shuttlebee.sms_api_url', company, ''),
-            'shuttlebee_sms_api_key': self._get_company_param(self.env, 'shuttlebee.sms_api_key', company, ''),
-            'shuttlebee_whatsapp_provider_type': self._get_company_param(self.env, 'shuttlebee.whatsapp_provider_type', company, 'waha_whatsapp'),
-            'shuttlebee_whatsapp_api_url': self._get_company_param(self.env, 'shuttlebee.whatsapp_api_url', company, ''),
-            'shuttlebee_whatsapp_api_key': self._get_company_param(self.env, 'shuttlebee.whatsapp_api_key', company, ''),
-            'shuttlebee_waha_session': self._get_company_param(self.env, 'shuttlebee.waha_session', company, 'default'),
-            'shuttlebee_waha_webhook_url': self._get_company_param(self.env, 'shuttlebee.waha_webhook_url', company, ''),
-            'shuttlebee_template_approaching': self._get_company_param(self.env, 'shuttlebee.template_approaching', company, ''),
-            'shuttlebee_template_arrived': self._get_company_param(self.env, 'shuttlebee.template_arrived', company, ''),
-            'shuttlebee_route_optimizer_url': self._get_company_param(self.env, 'shuttlebee.route_optimizer_url', company, 'https://route-optimizer.geniura.com/optimize'),
-            'shuttlebee_route_optimizer_timeout': int(self._get_company_param(self.env, 'shuttlebee.route_optimizer_timeout', company, 60) or 60),
-            'shuttlebee_route_optimizer_speed_kmh': float(self._get_company_param(self.env, 'shuttlebee.route_optimizer_speed_kmh', company, 40.0) or 40.0),
-            'shuttlebee_route_optimizer_max_time': int(self._get_company_param(self.env, 'shuttlebee.route_optimizer_max_time', company, 30) or 30),
-        })
+        company_id = self.env.company.id
+        # The provider lookup is served from the ormcache; WAHA keys are
+        # only fetched when the WAHA block is actually shown
+        provider_type = self._get_company_param(
+            self.env, 'shuttlebee.whatsapp_provider_type', company_id, 'waha_whatsapp'
+        )
+        specs = _visible_params(provider_type)
+        params = self._get_company_params(self.env, {
+            key: default for _field, key, default in specs
+        }, company_id)
+        res['shuttlebee_company_id'] = company_id
+        res['shuttlebee_waha_params_loaded'] = provider_type == 'waha_whatsapp'
+        for field, key, default in specs:
+            res[field] = _parse_param(params[key], default)
         return res
 
     def _compute_waha_session_status(self):
-        """Compute WAHA session status"""
+        """
+        Compute WAHA session status
+
+        WAHA is only queried when the compute_waha_status context key is set
+        (Refresh Status button), so rendering the settings form does no
+        network I/O. Records pointing at the same WAHA server are resolved
+        with a single request.
+        """
+        refresh = self.env.context.get('compute_waha_status')
+        endpoints = defaultdict(lambda: defaultdict(list))
         for record in self:
             record.shuttlebee_waha_session_status = 'غير مُهيأ'
             
@@ -212,190 +375,147 @@ class ResConfigSettings(models.TransientModel):
                 record.shuttlebee_waha_session_status = 'غير مطبق (ليس WAHA)'
                 continue
             
+            if not refresh:
+                record.shuttlebee_waha_session_status = '— (اضغط تحديث الحالة)'
+                continue
+            
+            endpoints[(
+                record.shuttlebee_whatsapp_api_url,
+                record.shuttlebee_whatsapp_api_key,
+            )][record.shuttlebee_waha_session or 'default'].append(record)
+
+        # One request per WAHA server: get_session() for a single session
+        # (briefly cached by the shared service), list_sessions() otherwise
+        for (api_url, api_key), sessions in endpoints.items():
             try:
-                from ..helpers.waha_service import create_waha_service, WAHAAPIError
-                
-                service = create_waha_service(
-                    api_url=record.shuttlebee_whatsapp_api_url,
-                    api_key=record.shuttlebee_whatsapp_api_key,
-                    session=record.shuttlebee_waha_session or 'default'
-                )
-                
-                session = service.get_session()
-                status = session.get('status') or session.get('engine', {}).get('status', 'UNKNOWN')
-                
-                status_map = {
-                    'WORKING': '✅ يعمل',
-                    'STOPPED': '⏹️ متوقف',
-                    'STARTING': '🔄 يبدأ...',
-                    'SCAN_QR_CODE': '📱 يحتاج QR Code',
-                    'FAILED': '❌ فشل',
-                }
-                record.shuttlebee_waha_session_status = status_map.get(status, f'❓ {status}')
-                
+                first_session = next(iter(sessions))
+                service = get_shared_waha_service(api_url, api_key, first_session)
+                if len(sessions) == 1:
+                    by_name = {first_session: service.get_session(timeout=WAHA_STATUS_TIMEOUT)}
+                else:
+                    by_name = {
+                        session.get('name'): session
+                        for session in service.list_sessions(timeout=WAHA_STATUS_TIMEOUT)
+                    }
+                for session_name, records in sessions.items():
+                    session = by_name.get(session_name, {})
+                    status = session.get('status') or session.get('engine', {}).get('status', 'UNKNOWN')
+                    display = WAHA_STATUS_LABELS.get(status, f'❓ {status}')
+                    for record in records:
+                        record.shuttlebee_waha_session_status = display
             except Exception as e:
                 _logger.warning(f'Failed to get WAHA session status: {e}')
-                record.shuttlebee_waha_session_status = f'❌ خطأ: {str(e)[:50]}'
+                display = f'❌ خطأ: {str(e)[:50]}'
+                for records in sessions.values():
+                    for record in records:
+                        record.shuttlebee_waha_session_status = display
 
-    def action_waha_create_session(self):
-        """Create WAHA session"""
-        self.ensure_one()
+    def _waha_call(self, operation, error_message, with_webhook=False, **kwargs):
+        """
+        Run a WAHA operation on the configured session
+
+        Args:
+            operation: WAHAService method name (e.g. 'start_session')
+            error_message: Translated message with a %s placeholder for the error
+            with_webhook: Pass the configured webhook URL to the service
+            **kwargs: Arguments for the operation
+
+        Returns:
+            The operation result
+
+        Raises:
+            UserError: If WAHA is not configured or the call fails
+        """
+        api_url, api_key, session_name, webhook_url = self._waha_settings()
         
-        if not self.shuttlebee_whatsapp_api_url or not self.shuttlebee_whatsapp_api_key:
+        if not api_url or not api_key:
             raise UserError(_('الرجاء إعداد WAHA API URL و API Key أولاً'))
         
+        service = get_shared_waha_service(
+            api_url,
+            api_key,
+            session_name,
+            webhook_url if with_webhook else None
+        )
         try:
-            from ..helpers.waha_service import create_waha_service, WAHAAPIError
-            
-            service = create_waha_service(
-                api_url=self.shuttlebee_whatsapp_api_url,
-                api_key=self.shuttlebee_whatsapp_api_key,
-                session=self.shuttlebee_waha_session or 'default',
-                webhook_url=self.shuttlebee_waha_webhook_url
-            )
-            
-            result = service.create_session()
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('WAHA Session'),
-                    'message': _('تم إنشاء الجلسة بنجاح'),
-                    'type': 'success',
-                    'sticky': False,
-                }
-            }
-            
+            return getattr(service, operation)(**kwargs)
         except Exception as e:
-            raise UserError(_('فشل إنشاء الجلسة: %s') % str(e))
+            raise UserError(error_message % str(e))
 
-    def action_waha_start_session(self):
-        """Start WAHA session"""
+    def _waha_settings(self):
+        """(api_url, api_key, session_name, webhook_url) read once from this record"""
         self.ensure_one()
-        
-        if not self.shuttlebee_whatsapp_api_url or not self.shuttlebee_whatsapp_api_key:
-            raise UserError(_('الرجاء إعداد WAHA API URL و API Key أولاً'))
-        
-        try:
-            from ..helpers.waha_service import create_waha_service
-            
-            service = create_waha_service(
-                api_url=self.shuttlebee_whatsapp_api_url,
-                api_key=self.shuttlebee_whatsapp_api_key,
-                session=self.shuttlebee_waha_session or 'default'
-            )
-            
-            result = service.start_session()
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('WAHA Session'),
-                    'message': _('تم تشغيل الجلسة'),
-                    'type': 'success',
-                    'sticky': False,
-                }
+        return (
+            self.shuttlebee_whatsapp_api_url,
+            self.shuttlebee_whatsapp_api_key,
+            self.shuttlebee_waha_session or 'default',
+            self.shuttlebee_waha_webhook_url,
+        )
+
+    @staticmethod
+    def _waha_notification(title, message, notification_type='success'):
+        """Client action showing a non-sticky notification"""
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'type': notification_type,
+                'sticky': False,
             }
-            
-        except Exception as e:
-            raise UserError(_('فشل تشغيل الجلسة: %s') % str(e))
+        }
+
+    def action_waha_create_session(self):
+        """Create WAHA session"""
+        self._waha_call('create_session', _('فشل إنشاء الجلسة: %s'), with_webhook=True)
+        return self._waha_notification(_('WAHA Session'), _('تم إنشاء الجلسة بنجاح'))
+
+    def action_waha_start_session(self):
+        """Start WAHA session"""
+        self._waha_call('start_session', _('فشل تشغيل الجلسة: %s'))
+        return self._waha_notification(_('WAHA Session'), _('تم تشغيل الجلسة'))
 
     def action_waha_stop_session(self):
         """Stop WAHA session"""
-        self.ensure_one()
-        
-        if not self.shuttlebee_whatsapp_api_url or not self.shuttlebee_whatsapp_api_key:
-            raise UserError(_('الرجاء إعداد WAHA API URL و API Key أولاً'))
-        
-        try:
-            from ..helpers.waha_service import create_waha_service
-            
-            service = create_waha_service(
-                api_url=self.shuttlebee_whatsapp_api_url,
-                api_key=self.shuttlebee_whatsapp_api_key,
-                session=self.shuttlebee_waha_session or 'default'
-            )
-            
-            result = service.stop_session()
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('WAHA Session'),
-                    'message': _('تم إيقاف الجلسة'),
-                    'type': 'warning',
-                    'sticky': False,
-                }
-            }
-            
-        except Exception as e:
-            raise UserError(_('فشل إيقاف الجلسة: %s') % str(e))
+        self._waha_call('stop_session', _('فشل إيقاف الجلسة: %s'))
+        return self._waha_notification(_('WAHA Session'), _('تم إيقاف الجلسة'), 'warning')
 
     def action_waha_get_qr_code(self):
         """Get QR code for WAHA pairing"""
-        self.ensure_one()
-        
-        if not self.shuttlebee_whatsapp_api_url or not self.shuttlebee_whatsapp_api_key:
-            raise UserError(_('الرجاء إعداد WAHA API URL و API Key أولاً'))
+        self._waha_call('get_qr_code', _('فشل الحصول على QR Code: %s'), format='image')
+        api_url, api_key, session_name, _webhook_url = self._waha_settings()
         
-        try:
-            from ..helpers.waha_service import create_waha_service
-            
-            service = create_waha_service(
-                api_url=self.shuttlebee_whatsapp_api_url,
-                api_key=self.shuttlebee_whatsapp_api_key,
-                session=self.shuttlebee_waha_session or 'default'
-            )
-            
-            qr_data = service.get_qr_code(format='image')
-            
-            # Open wizard to display QR code
-            return {
-                'type': 'ir.actions.act_window',
-                'name': _('WAHA QR Code'),
-                'res_model': 'shuttle.waha.qr.wizard',
-                'view_mode': 'form',
-                'target': 'new',
-                'context': {
-                    'default_qr_code_url': f"{self.shuttlebee_whatsapp_api_url}/api/{self.shuttlebee_waha_session or 'default'}/auth/qr?format=image",
-                    'default_api_key': self.shuttlebee_whatsapp_api_key,
-                }
+        # Open wizard to display QR code
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('WAHA QR Code'),
+            'res_model': 'shuttle.waha.qr.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_qr_code_url': f"{api_url}/api/{session_name}/auth/qr?format=image",
+                'default_api_key': api_key,
             }
-            
-        except Exception as e:
-            raise UserError(_('فشل الحصول على QR Code: %s') % str(e))
+        }
 
     def action_waha_test_connection(self):
-        """Test WAHA API connection"""
+        """Test WAHA API connection and report the session status"""
+        sessions = self._waha_call('list_sessions', _('❌ فشل الاتصال: %s'))
+        return self._waha_notification(
+            _('WAHA Connection'),
+            _('✅ الاتصال ناجح! عدد الجلسات: %s') % len(sessions)
+            + '\n' + self._refresh_waha_session_status()
+        )
+
+    def action_waha_refresh_status(self):
+        """Query WAHA for the current session status"""
+        return self._waha_notification(_('WAHA Session'), self._refresh_waha_session_status(), 'info')
+
+    def _refresh_waha_session_status(self):
+        """Recompute the session status from WAHA; the only paths that query it"""
         self.ensure_one()
         
-        if not self.shuttlebee_whatsapp_api_url or not self.shuttlebee_whatsapp_api_key:
-            raise UserError(_('الرجاء إعداد WAHA API URL و API Key أولاً'))
-        
-        try:
-            from ..helpers.waha_service import create_waha_service
-            
-            service = create_waha_service(
-                api_url=self.shuttlebee_whatsapp_api_url,
-                api_key=self.shuttlebee_whatsapp_api_key,
-                session=self.shuttlebee_waha_session or 'default'
-            )
-            
-            sessions = service.list_sessions()
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('WAHA Connection'),
-                    'message': _('✅ الاتصال ناجح! عدد الجلسات: %s') % len(sessions),
-                    'type': 'success',
-                    'sticky': False,
-                }
-            }
-            
-        except Exception as e:
-            raise UserError(_('❌ فشل الاتصال: %s') % str(e))
+        record = self.with_context(compute_waha_status=True)
+        record.invalidate_recordset(['shuttlebee_waha_session_status'])
+        return record.shuttlebee_waha_session_status
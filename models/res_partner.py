@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import uuid
+from secrets import token_hex
+from collections import defaultdict
 
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
@@ -75,8 +76,7 @@ class ResPartner(models.Model):
     )
     attendance_rate = fields.Float(
         string='Attendance Rate (%)',
-        compute='_compute_shuttle_stats',
-        store=True
+        compute='_compute_attendance_rate'
     )
 
     # Notes
@@ -88,12 +88,12 @@ class ResPartner(models.Model):
     # GPS Coordinates (for passengers without assigned stops)
     shuttle_latitude = fields.Float(
         string='Latitude',
-        digits=(10, 7),
+        digits=(9, 6),
         help='GPS latitude for custom pickup location'
     )
     shuttle_longitude = fields.Float(
         string='Longitude',
-        digits=(10, 7),
+        digits=(9, 6),
         help='GPS longitude for custom pickup location'
     )
     has_guardian = fields.Boolean(
@@ -143,20 +143,39 @@ class ResPartner(models.Model):
     )
     portal_access_token = fields.Char(
         string='Portal Access Token',
-        copy=False
+        copy=False,
+        prefetch=False
     )
 
     # Computed Methods
     @api.depends('shuttle_trip_line_ids.status')
     def _compute_shuttle_stats(self):
+        # Count lines per (passenger, status) in SQL instead of loading every line
+        totals = defaultdict(int)
+        present = defaultdict(int)
+        absent = defaultdict(int)
+        partner_ids = [pid for pid in self.ids if isinstance(pid, int)]
+        if partner_ids:
+            groups = self.env['shuttle.trip.line']._read_group(
+                [('passenger_id', 'in', partner_ids)],
+                ['passenger_id', 'status'],
+                ['__count']
+            )
+            for passenger, status, count in groups:
+                totals[passenger.id] += count
+                if status in ('boarded', 'dropped'):
+                    present[passenger.id] += count
+                elif status == 'absent':
+                    absent[passenger.id] += count
+
         for partner in self:
-            lines = partner.shuttle_trip_line_ids
-            partner.total_trips = len(lines)
-            partner.present_trips = len(lines.filtered(
-                lambda l: l.status in ['boarded', 'dropped']))
-            partner.absent_trips = len(lines.filtered(
-                lambda l: l.status == 'absent'))
+            partner.total_trips = totals[partner.id]
+            partner.present_trips = present[partner.id]
+            partner.absent_trips = absent[partner.id]
 
+    @api.depends('total_trips', 'present_trips')
+    def _compute_attendance_rate(self):
+        for partner in self:
             if partner.total_trips > 0:
                 partner.attendance_rate = (partner.present_trips / partner.total_trips) * 100
             else:
@@ -175,32 +194,44 @@ class ResPartner(models.Model):
         }
 
     def _ensure_portal_token(self):
-        for partner in self:
-            if not partner.portal_access_token:
-                partner.portal_access_token = uuid.uuid4().hex
+        missing = self.filtered(lambda partner: not partner.portal_access_token)
+        if not missing:
+            return
+        # One UPDATE for the whole batch; rows given a token concurrently keep theirs
+        self.flush_recordset(['portal_access_token'])
+        tokens = [(partner.id, token_hex(16)) for partner in missing]
+        self.env.cr.execute(
+            """
+            UPDATE res_partner p
+               SET portal_access_token = v.token,
+                   write_uid = %%s,
+                   write_date = now() at time zone 'UTC'
+              FROM (VALUES %s) AS v(id, token)
+             WHERE p.id = v.id
+               AND COALESCE(p.portal_access_token, '') = ''
+            """ % ', '.join(['%s'] * len(tokens)),
+            [self.env.uid] + tokens
+        )
+        missing.invalidate_recordset(['portal_access_token', 'write_uid', 'write_date'])
 
     def action_send_portal_invitation(self):
         """Prepare to send a portal invitation to the guardian (via SMS/WhatsApp)"""
+        if not self:
+            return
+        # Get guardian information (prefer father, then mother) for every partner first;
+        # load just the two phone columns for the whole batch in one query
+        self.fetch(['father_phone', 'mother_phone'])
         for partner in self:
-            # Get guardian information (prefer father, then mother)
-            guardian_name = None
-            guardian_phone = None
-            
-            if partner.father_phone:
-                guardian_name = partner.father_name or _('Father')
-                guardian_phone = partner.father_phone
-            elif partner.mother_phone:
-                guardian_name = partner.mother_name or _('Mother')
-                guardian_phone = partner.mother_phone
-            
-            if not guardian_phone:
+            if not (partner.father_phone or partner.mother_phone):
                 raise ValidationError(
                     _('Please set guardian phone number (father or mother) before sending an invitation.')
                 )
-            
-            partner._ensure_portal_token()
-            # Note: This function can be extended to send SMS/WhatsApp instead of email
-            # For now, it generates the token but requires email integration for actual sending
-            raise ValidationError(
-                _('Portal invitation via SMS/WhatsApp will be available soon. Token generated: %s') % partner.portal_access_token
-            )
+        
+        # Tokens for the whole batch at once
+        self._ensure_portal_token()
+        # Note: This function can be extended to send SMS/WhatsApp instead of email
+        # For now, it generates the tokens but requires email integration for actual sending
+        raise ValidationError(
+            _('Portal invitation via SMS/WhatsApp will be available soon. Token generated: %s')
+            % ', '.join(self.mapped('portal_access_token'))
+        )
@@ -27,17 +27,19 @@ class ResUsers(models.Model):
     @api.depends('groups_id')
     def _compute_shuttle_role(self):
         """Compute user's ShuttleBee role based on assigned groups"""
+        # Resolved once for the batch, highest role first; groups_id includes
+        # implied groups, so membership gives the same answer as has_group()
+        role_groups = [
+            (role, self.env.ref(f'shuttlebee.group_shuttle_{role}', raise_if_not_found=False))
+            for role in ('manager', 'dispatcher', 'driver', 'user')
+        ]
+        role_groups = [(role, group) for role, group in role_groups if group]
         for user in self:
-            if user.has_group('shuttlebee.group_shuttle_manager'):
-                user.shuttle_role = 'manager'
-            elif user.has_group('shuttlebee.group_shuttle_dispatcher'):
-                user.shuttle_role = 'dispatcher'
-            elif user.has_group('shuttlebee.group_shuttle_driver'):
-                user.shuttle_role = 'driver'
-            elif user.has_group('shuttlebee.group_shuttle_user'):
-                user.shuttle_role = 'user'
-            else:
-                user.shuttle_role = 'none'
+            user_groups = user.groups_id
+            user.shuttle_role = next(
+                (role for role, group in role_groups if group in user_groups),
+                'none'
+            )
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -56,18 +58,23 @@ class ResUsers(models.Model):
 
     def _auto_assign_shuttle_groups(self):
         """Automatically assign ShuttleBee groups based on user's existing groups"""
+        # Get ShuttleBee groups
+        shuttle_manager = self.env.ref('shuttlebee.group_shuttle_manager', raise_if_not_found=False)
+        shuttle_user = self.env.ref('shuttlebee.group_shuttle_user', raise_if_not_found=False)
+        
+        if not shuttle_user:
+            return
+        # Resolved once; groups_id already holds implied groups, so plain
+        # membership matches has_group() without a lookup per user
+        admin_groups = self.env.ref('base.group_system') | self.env.ref('base.group_erp_manager')
+        
+        # Users to add per group, written once per group below
+        to_add = {shuttle_manager: [], shuttle_user: []}
+        
         for user in self:
             # Skip if user is not active
             if not user.active:
                 continue
-                
-            # Get ShuttleBee groups
-            shuttle_manager = self.env.ref('shuttlebee.group_shuttle_manager', raise_if_not_found=False)
-            shuttle_dispatcher = self.env.ref('shuttlebee.group_shuttle_dispatcher', raise_if_not_found=False)
-            shuttle_user = self.env.ref('shuttlebee.group_shuttle_user', raise_if_not_found=False)
-            
-            if not shuttle_user:
-                continue
             
             # Get user's current groups
             user_groups = user.groups_id
@@ -75,25 +82,20 @@ class ResUsers(models.Model):
             
             # Check if user has Manager or Administrator groups
             has_manager = (
-                user.has_group('base.group_system') or
-                user.has_group('base.group_erp_manager') or
+                bool(admin_groups & user_groups) or
                 any('Manager' in name for name in user_group_names) or
                 any('Administrator' in name for name in user_group_names)
             )
             
-            # Auto-assign groups
-            groups_to_add = []
-            
             if has_manager and shuttle_manager:
                 # Manager gets full access
                 if shuttle_manager not in user_groups:
-                    groups_to_add.append(shuttle_manager.id)
-            elif shuttle_user:
+                    to_add[shuttle_manager].append(user.id)
+            elif shuttle_user not in user_groups:
                 # Everyone else gets basic user access
-                if shuttle_user not in user_groups:
-                    groups_to_add.append(shuttle_user.id)
-            
-            # Add groups if needed
-            if groups_to_add:
-                user.sudo().write({'groups_id': [(4, gid) for gid in groups_to_add]})
-
+                to_add[shuttle_user].append(user.id)
+        
+        # One update of the group/user relation per group instead of one per user
+        for group, user_ids in to_add.items():
+            if group and user_ids:
+                group.sudo().write({'users': [(4, uid) for uid in user_ids]})
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import api, models
+from odoo import api, models, tools
 
 
 class ShuttleConfigHelper(models.AbstractModel):
@@ -21,6 +21,13 @@ class ShuttleConfigHelper(models.AbstractModel):
     @api.model
     def get_enums(self):
         """Return all selection enums used across shuttle models"""
+        # Copies, so callers cannot alter the cached dictionaries
+        return {key: dict(values) for key, values in self._get_enums_cached().items()}
+
+    @api.model
+    @tools.ormcache()
+    def _get_enums_cached(self):
+        """Selections are fixed once the registry is loaded; build them once per registry"""
         Trip = self.env['shuttle.trip']
         TripLine = self.env['shuttle.trip.line']
         Stop = self.env['shuttle.stop']
@@ -1,8 +1,19 @@
 # -*- coding: utf-8 -*-
 
-from odoo import api, fields, models, _
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Days of GPS history kept for finished trips (shuttlebee.gps_retention_days);
+# 0 keeps everything, purging is opt-in
+GPS_RETENTION_DAYS = 0
+# Positions removed per purge cron run before it reschedules itself
+PURGE_BATCH_SIZE = 10000
+
 
 class ShuttleGpsPosition(models.Model):
     _name = 'shuttle.gps.position'
@@ -64,22 +75,59 @@ class ShuttleGpsPosition(models.Model):
          'Latitude must be between -90 and 90, and longitude between -180 and 180.')
     ]
 
+    def init(self):
+        # Trip tracks are read in timestamp order; the timestamp index serves _order on unfiltered lists
+        tools.create_index(
+            self.env.cr,
+            'shuttle_gps_position_trip_timestamp_idx',
+            self._table,
+            ['trip_id', 'timestamp DESC']
+        )
+
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            self._validate_coordinates(vals.get('latitude'), vals.get('longitude'))
+        # Ranges are enforced by the gps_coordinates_range CHECK constraint
+        if any(vals.get('latitude') is None or vals.get('longitude') is None for vals in vals_list):
+            raise ValidationError(_('Latitude and longitude are required.'))
         return super().create(vals_list)
 
     def write(self, vals):
-        if 'latitude' in vals or 'longitude' in vals:
-            lat = vals.get('latitude', self.latitude)
-            lon = vals.get('longitude', self.longitude)
-            self._validate_coordinates(lat, lon)
+        if any(field in vals and vals[field] is None for field in ('latitude', 'longitude')):
+            raise ValidationError(_('Latitude and longitude are required.'))
         return super().write(vals)
 
-    def _validate_coordinates(self, latitude, longitude):
-        if latitude is None or longitude is None:
-            raise ValidationError(_('Latitude and longitude are required.'))
-        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
-            raise ValidationError(_('Latitude must be between -90 and 90, and longitude between -180 and 180.'))
+    @api.model
+    def _cron_purge_old_positions(self, batch_size=PURGE_BATCH_SIZE):
+        """
+        Delete GPS positions of finished trips older than the retention period
 
+        Keeps the telemetry table, and the indexes updated on every insert,
+        bounded by the retention window instead of the whole trip history.
+        Works in batches; the cron is rerun immediately while rows remain.
+        """
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'shuttlebee.gps_retention_days', GPS_RETENTION_DAYS
+        ) or 0)
+        if days <= 0:
+            return True
+        cutoff = fields.Date.context_today(self) - timedelta(days=days)
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            DELETE FROM shuttle_gps_position
+             WHERE id IN (
+                    SELECT p.id
+                      FROM shuttle_gps_position p
+                      JOIN shuttle_trip t ON t.id = p.trip_id
+                     WHERE t.state IN ('done', 'cancelled')
+                       AND t.date < %s
+                     LIMIT %s
+             )
+            """,
+            (cutoff, batch_size)
+        )
+        deleted = self.env.cr.rowcount
+        self.invalidate_model()
+        _logger.info('GPS purge: deleted %d positions of trips before %s', deleted, cutoff)
+        self.env['ir.cron']._notify_progress(done=deleted, remaining=int(deleted >= batch_size))
+        return True
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from odoo import fields, models, _
+from datetime import timedelta
+
+from odoo import api, fields, models, tools, _
 
 
 class ShuttleHoliday(models.Model):
@@ -36,6 +38,48 @@ class ShuttleHoliday(models.Model):
          'End date must be after start date.'),
     ]
 
+    def init(self):
+        # Serves the per-company date range lookups of holidays_covering()
+        tools.create_index(
+            self.env.cr,
+            'shuttle_holiday_company_dates_idx',
+            self._table,
+            ['company_id', 'start_date', 'end_date'],
+            where='active'
+        )
+
+    @api.model
+    def holidays_covering(self, dates, company_id=None):
+        """
+        Which of the given dates fall inside an active holiday of the company
+
+        Args:
+            dates: Iterable of dates to check
+            company_id: Company id (False matches holidays without a company);
+                defaults to the current company when omitted
+
+        Returns:
+            Set of the given dates covered by a holiday
+        """
+        dates = set(dates)
+        if not dates:
+            return set()
+        first, last = min(dates), max(dates)
+        holidays = self.search_read([
+            ('active', '=', True),
+            ('company_id', '=', self.env.company.id if company_id is None else company_id),
+            ('start_date', '<=', last),
+            ('end_date', '>=', first),
+        ], ['start_date', 'end_date'])
+        covered = set()
+        for holiday in holidays:
+            day = max(holiday['start_date'], first)
+            end = min(holiday['end_date'], last)
+            while day <= end:
+                covered.add(day)
+                day += timedelta(days=1)
+        return covered & dates
+
     def includes_date(self, target_date):
         self.ensure_one()
         if not self.active:
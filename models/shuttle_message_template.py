@@ -4,13 +4,33 @@ Shuttle Message Templates
 Customizable message templates for all notification types
 """
 
+import functools
 import logging
+import string
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
 _logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=256)
+def _template_fields(body):
+    """
+    Placeholder names used by a template body
+
+    Parsed once per distinct body; templates change rarely while the same
+    body is rendered for every notification sent with it.
+
+    Raises:
+        ValueError: If the body is not a valid format string
+    """
+    return frozenset(
+        name.split('.', 1)[0].split('[', 1)[0]
+        for _literal, name, _spec, _conversion in string.Formatter().parse(body)
+        if name
+    )
+
+
 class ShuttleMessageTemplate(models.Model):
     _name = 'shuttle.message.template'
     _description = 'Shuttle Message Template'
@@ -133,7 +153,7 @@ class ShuttleMessageTemplate(models.Model):
         for record in self:
             if record.body:
                 try:
-                    record.preview_text = record.body.format(**sample_data)
+                    record.preview_text = record.body.format_map(sample_data)
                 except KeyError as e:
                     record.preview_text = f"خطأ في القالب: {e}"
                 except Exception:
@@ -238,10 +258,11 @@ class ShuttleMessageTemplate(models.Model):
         render_values = {**defaults, **values}
         
         try:
-            return self.body.format(**render_values)
-        except KeyError as e:
-            _logger.warning(f'Missing placeholder in template {self.name}: {e}')
-            return self.body
+            missing = _template_fields(self.body) - render_values.keys()
+            if missing:
+                _logger.warning(f'Missing placeholder in template {self.name}: {", ".join(sorted(missing))}')
+                return self.body
+            return self.body.format_map(render_values)
         except Exception as e:
             _logger.error(f'Error rendering template {self.name}: {e}')
             return self.body
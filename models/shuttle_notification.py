@@ -11,7 +11,8 @@ from ..helpers.retry_utils import retry_with_backoff, RetryConfig
 from ..helpers.notification_providers import ProviderFactory
 from ..helpers.logging_utils import StructuredLogger, notification_logger
 from ..helpers.security_utils import template_renderer
-from ..helpers.rate_limiter import notification_rate_limiter
+from ..helpers import rate_limiter
+from ..helpers.waha_service import get_shared_waha_service
 
 _logger = logging.getLogger('shuttlebee.notification')
 
@@ -62,6 +63,7 @@ class ShuttleNotification(models.Model):
     # Status
     status = fields.Selection([
         ('pending', 'Pending'),
+        ('queued', 'Queued'),
         ('sent', 'Sent'),
         ('failed', 'Failed'),
         ('delivered', 'Delivered'),
@@ -209,12 +211,14 @@ class ShuttleNotification(models.Model):
         )
 
     def _get_company_param(self, key, default=None):
-        """Get company-specific parameter"""
+        """Get company-specific parameter (served from the settings ormcache)"""
         company = self.company_id or self.env.company
-        return self.env['ir.config_parameter'].sudo().get_param(key, default)
+        return self.env['res.config.settings']._get_company_param(self.env, key, company.id, default)
 
     def _send_notification(self):
         """Send notification via specified channel with rate limiting and retries"""
+        # Resolved here so the shared limiter is only built once notifications are sent
+        notification_rate_limiter = rate_limiter.notification_rate_limiter
         for notification in self:
             try:
                 # Validate contact information before sending
@@ -239,6 +243,11 @@ class ShuttleNotification(models.Model):
                         notification.channel.upper()
                     )
 
+                # WAHA outbox: the notification stays queued until the cron delivers it
+                if notification.channel == 'whatsapp' and notification._use_waha_outbox():
+                    notification._enqueue_whatsapp()
+                    continue
+
                 # Map channel to send method
                 channel_map = {
                     'sms': notification._send_sms,
@@ -399,6 +408,44 @@ class ShuttleNotification(models.Model):
             )
             raise UserError(_('Failed to send WhatsApp: %s') % str(e))
 
+    def _use_waha_outbox(self):
+        """Whether WhatsApp messages are queued in the WAHA outbox"""
+        provider_type = self._get_company_param('shuttlebee.whatsapp_provider_type', 'waha_whatsapp')
+        return (
+            provider_type == 'waha_whatsapp'
+            and self.env['shuttle.waha.outbox']._is_async_delivery_enabled(self.company_id)
+        )
+
+    def _enqueue_whatsapp(self):
+        """Queue the WhatsApp message in the WAHA outbox"""
+        whatsapp_api_url = self._get_company_param('shuttlebee.whatsapp_api_url')
+        whatsapp_api_key = self._get_company_param('shuttlebee.whatsapp_api_key')
+
+        if not whatsapp_api_url or not whatsapp_api_key:
+            raise UserError(
+                _('WhatsApp API is not configured. Please configure it in Settings → ShuttleBee.')
+            )
+
+        phone_clean = ValidationHelper.clean_phone(self.recipient_phone)
+        service = get_shared_waha_service(
+            whatsapp_api_url,
+            whatsapp_api_key,
+            self._get_company_param('shuttlebee.waha_session', 'default')
+        )
+        service.enqueue_send_text(
+            self.env['shuttle.waha.outbox'],
+            service.format_phone_to_chat_id(phone_clean),
+            self.message_content,
+            notification=self
+        )
+        self.status = 'queued'
+
+        notification_logger.info(
+            'whatsapp_queued',
+            notification_id=self.id,
+            phone=phone_clean
+        )
+
     def action_send_whatsapp_image(self, image_url, caption=''):
         """
         Send WhatsApp image message (WAHA specific feature)
@@ -603,7 +650,8 @@ class ShuttleNotification(models.Model):
 
     def action_retry(self):
         """Retry sending failed notification"""
-        for rec in self:
+        # Queued messages are still owned by the WAHA outbox, which retries them
+        for rec in self.filtered(lambda n: n.status in ('failed', 'pending')):
             if rec.retry_count >= self.MAX_RETRIES:
                 raise UserError(
                     _('Maximum retries exceeded for notification %s') % rec.display_name
@@ -734,13 +734,10 @@ class ShuttlePassengerGroup(models.Model):
             total_days = min(total_days, days_remaining)
 
         # Global holidays (company-level) also block trip generation for ALL groups.
-        end_dt = start_dt + timedelta(days=total_days - 1) if total_days else start_dt
-        global_holidays = self.env['shuttle.holiday'].search([
-            ('active', '=', True),
-            ('company_id', '=', self.company_id.id),
-            ('start_date', '<=', end_dt),
-            ('end_date', '>=', start_dt),
-        ])
+        global_holiday_dates = self.env['shuttle.holiday'].holidays_covering(
+            (start_dt + timedelta(days=offset) for offset in range(total_days)),
+            self.company_id.id
+        )
 
         for offset in range(total_days):
             current_date = start_dt + timedelta(days=offset)
@@ -751,7 +748,7 @@ class ShuttlePassengerGroup(models.Model):
             if not day_lines:
                 continue
             # Skip if date inside global holiday
-            if global_holidays.filtered(lambda h: h.start_date <= current_date <= h.end_date):
+            if current_date in global_holiday_dates:
                 continue
             # Skip if date inside holiday
             if active_holidays.filtered(lambda h: h.start_date <= current_date <= h.end_date):
@@ -1323,6 +1320,12 @@ class ShuttlePassengerGroupLine(models.Model):
         'group_id.company_id.shuttle_longitude'
     )
     def _compute_location_displays(self):
+        # Load the related stops, passengers and companies for the whole
+        # batch up front instead of record by record
+        self.pickup_stop_id.mapped('display_name')
+        self.dropoff_stop_id.mapped('display_name')
+        self.passenger_id.mapped('contact_address')
+        self.group_id.company_id.mapped('shuttle_latitude')
         for line in self:
             pickup_stop = line.pickup_stop_id
             dropoff_stop = line.dropoff_stop_id
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError, UserError
 
 _logger = logging.getLogger(__name__)
@@ -168,6 +168,15 @@ class ShuttleTripLine(models.Model):
         ('positive_seats', 'CHECK(seat_count > 0)',
          'Seat count must be positive!'),
     ]
+
+    def init(self):
+        # Covers the per-passenger status counts behind the partner trip statistics
+        tools.create_index(
+            self.env.cr,
+            'shuttle_trip_line_passenger_status_idx',
+            self._table,
+            ['passenger_id', 'status']
+        )
     
     @api.model_create_multi
     def create(self, vals_list):
@@ -290,22 +299,23 @@ class ShuttleTripLine(models.Model):
             return self._service_response(updates)
         
         trip = self[0].trip_id
-        marked_count = 0
+        to_board = trip.line_ids.filtered(lambda l: l.status not in ('absent', 'boarded'))
+        previous = {line.id: line.status for line in to_board}
         
-        for line in trip.line_ids:
-            if line.status != 'absent' and line.status != 'boarded':
-                previous_status = line.status
-                line.write({
-                    'status': 'boarded',
-                    'boarding_time': fields.Datetime.now() if not line.boarding_time else line.boarding_time,
-                })
-                updates.append({
-                    'trip_line_id': line.id,
-                    'trip_id': line.trip_id.id,
-                    'previous_status': previous_status,
-                    'new_status': line.status,
-                })
-                marked_count += 1
+        # Two batched writes instead of one per passenger, so dependent
+        # passenger statistics are recomputed once for the whole trip
+        without_time = to_board.filtered(lambda l: not l.boarding_time)
+        (to_board - without_time).write({'status': 'boarded'})
+        without_time.write({'status': 'boarded', 'boarding_time': fields.Datetime.now()})
+        
+        for line in to_board:
+            updates.append({
+                'trip_line_id': line.id,
+                'trip_id': line.trip_id.id,
+                'previous_status': previous[line.id],
+                'new_status': line.status,
+            })
+        marked_count = len(to_board)
         
         if marked_count > 0:
             trip.message_post(
@@ -417,10 +427,12 @@ class ShuttleTripLine(models.Model):
         """Send approaching notification using customizable templates"""
         MessageTemplate = self.env['shuttle.message.template']
         
+        Settings = self.env['res.config.settings']
+        
         for line in self:
-            # Get default notification channel from settings
-            default_channel = self.env['ir.config_parameter'].sudo().get_param(
-                'shuttlebee.notification_channel', 'whatsapp'
+            # Default notification channel of the trip's company (ormcached)
+            default_channel = Settings._get_company_param(
+                self.env, 'shuttlebee.notification_channel', line.trip_id.company_id, 'whatsapp'
             )
             
             # Get passenger language preference (default to Arabic)
@@ -474,10 +486,12 @@ class ShuttleTripLine(models.Model):
         """Send arrived notification using customizable templates"""
         MessageTemplate = self.env['shuttle.message.template']
         
+        Settings = self.env['res.config.settings']
+        
         for line in self:
-            # Get default notification channel from settings
-            default_channel = self.env['ir.config_parameter'].sudo().get_param(
-                'shuttlebee.notification_channel', 'whatsapp'
+            # Default notification channel of the trip's company (ormcached)
+            default_channel = Settings._get_company_param(
+                self.env, 'shuttlebee.notification_channel', line.trip_id.company_id, 'whatsapp'
             )
             
             # Get passenger language preference
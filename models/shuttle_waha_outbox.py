@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from ..helpers.waha_service import get_shared_waha_service, WAHAAPIError
+
+_logger = logging.getLogger(__name__)
+
+# Delivery attempts before a queued request is given up
+MAX_ATTEMPTS = 5
+# Delay before the first retry, doubled on every further attempt
+RETRY_BASE_SECONDS = 30
+# Sessions delivered in parallel by one cron run
+WAHA_MAX_INFLIGHT = 4
+# Requests taken per session and cron run, so one busy session cannot starve the others
+PER_SESSION_LIMIT = 50
+
+
+class ShuttleWahaOutbox(models.Model):
+    """
+    Outgoing WAHA requests delivered in the background.
+    Callers return as soon as the row is stored; the outbox cron sends
+    pending rows and retries failures with exponential backoff.
+    """
+    _name = 'shuttle.waha.outbox'
+    _description = 'ShuttleBee WAHA Outbox'
+    _order = 'next_attempt_at, id'
+
+    endpoint = fields.Char(string='Endpoint', required=True)
+    payload = fields.Text(string='Payload', required=True, help='JSON request body')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    attempts = fields.Integer(string='Attempts', default=0)
+    next_attempt_at = fields.Datetime(
+        string='Next Attempt',
+        default=fields.Datetime.now,
+        required=True,
+        index=True
+    )
+    session = fields.Char(string='WAHA Session', index=True)
+    last_error = fields.Text(string='Last Error')
+    notification_id = fields.Many2one(
+        'shuttle.notification',
+        string='Notification',
+        ondelete='set null',
+        index=True
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        default=lambda self: self.env.company,
+        index=True
+    )
+
+    @api.model
+    def enqueue(self, endpoint, payload, notification=None, company=None):
+        """
+        Queue a WAHA request for background delivery
+
+        Args:
+            endpoint: API endpoint (e.g. '/api/sendText')
+            payload: Request body
+            notification: shuttle.notification updated once delivered
+            company: Company whose WAHA settings are used for delivery
+
+        Returns:
+            The created outbox record
+        """
+        company = company or (notification and notification.company_id) or self.env.company
+        return self.sudo().create({
+            'endpoint': endpoint,
+            'payload': json.dumps(payload),
+            'session': payload.get('session'),
+            'notification_id': notification.id if notification else False,
+            'company_id': company.id,
+        })
+
+    @api.model
+    def _is_async_delivery_enabled(self, company=None):
+        """Whether WAHA messages should go through the outbox (WAHA_ASYNC_DELIVERY)"""
+        value = self.env['res.config.settings']._get_company_param(
+            self.env, 'shuttlebee.waha_async_delivery', company, False
+        )
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    @api.model
+    def _get_service(self, company):
+        """WAHAService built from the company's WhatsApp settings, or None"""
+        settings = self.env['res.config.settings']
+        company_id = company.id
+        api_url = settings._get_company_param(self.env, 'shuttlebee.whatsapp_api_url', company_id)
+        api_key = settings._get_company_param(self.env, 'shuttlebee.whatsapp_api_key', company_id)
+        if not api_url or not api_key:
+            return None
+        # Shared across cron runs so its pooled connections stay warm
+        return get_shared_waha_service(
+            api_url,
+            api_key,
+            settings._get_company_param(self.env, 'shuttlebee.waha_session', company_id, 'default') or 'default'
+        )
+
+    @api.model
+    def _cron_process_outbox(self, limit_per_session=PER_SESSION_LIMIT):
+        """
+        Deliver due pending requests
+
+        Each (company, session) queue is drained in order by a single
+        worker, holding a transaction-level advisory lock so overlapping
+        runs skip it; up to WAHA_MAX_INFLIGHT queues are sent concurrently.
+        """
+        now = fields.Datetime.now()
+        services = {}
+        batches = []
+        due_domain = [('state', '=', 'pending'), ('next_attempt_at', '<=', now)]
+        for company, session in self._read_group(due_domain, ['company_id', 'session']):
+            if not self._try_lock_session(company, session):
+                continue
+            # Oldest first; a request waiting for its retry holds back the
+            # ones queued after it
+            queued = self.search([
+                ('state', '=', 'pending'),
+                ('company_id', '=', company.id),
+                ('session', '=', session),
+            ], order='id', limit=limit_per_session)
+            rows = self.browse()
+            for row in queued:
+                if row.next_attempt_at > now:
+                    break
+                rows |= row
+            if not rows:
+                continue
+            if company not in services:
+                services[company] = self._get_service(company)
+            service = services[company]
+            if service is None:
+                rows._record_failure('WAHA is not configured')
+                continue
+            requests_ = [(row.endpoint, json.loads(row.payload)) for row in rows]
+            batches.append((rows, service, requests_))
+
+        # Only HTTP calls run in worker threads; the cursor stays on this thread
+        with ThreadPoolExecutor(max_workers=WAHA_MAX_INFLIGHT) as executor:
+            outcomes = list(executor.map(lambda batch: self._send_in_order(*batch[1:]), batches))
+
+        delivered = 0
+        for (rows, _service, _requests), results in zip(batches, outcomes):
+            for row, (result, error) in zip(rows, results):
+                if error is None:
+                    row._mark_delivered(result)
+                    delivered += 1
+                else:
+                    row._record_failure(error)
+        # Messages are already out: make the outcomes durable now, so nothing
+        # later in this transaction can roll them back into 'pending' and get
+        # them sent again. Committing per row would release the session locks
+        # while later rows of the same batch are still pending.
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+
+        _logger.info('WAHA outbox: delivered %d queued requests from %d sessions', delivered, len(batches))
+        return True
+
+    @api.model
+    def _try_lock_session(self, company, session):
+        """Take the per-session delivery lock for this transaction, if free"""
+        self.env.cr.execute(
+            'SELECT pg_try_advisory_xact_lock(%s, hashtext(%s))',
+            (company.id, session or '')
+        )
+        return self.env.cr.fetchone()[0]
+
+    @staticmethod
+    def _send_in_order(service, requests_):
+        """
+        Send one session's requests sequentially
+
+        Stops at the first failure so later messages are not delivered
+        before the one being retried.
+
+        Returns:
+            List of (result, error) for the requests attempted
+        """
+        outcomes = []
+        for endpoint, payload in requests_:
+            try:
+                outcomes.append((service.post(endpoint, payload), None))
+            except WAHAAPIError as e:
+                outcomes.append((None, str(e)))
+                break
+        return outcomes
+
+    def _mark_delivered(self, result):
+        """Record a successful delivery"""
+        self.ensure_one()
+        self.write({
+            'state': 'done',
+            'attempts': self.attempts + 1,
+            'last_error': False,
+        })
+        if self.notification_id:
+            message_id = result.get('id') or result.get('key', {}).get('id')
+            self._update_notification('_mark_sent', {
+                'api_response': f'WAHA: Message sent successfully. ID: {message_id}',
+                'provider_message_id': message_id,
+            })
+
+    def _update_notification(self, method, *args):
+        """
+        Report the outcome to the linked notification
+
+        Runs in a savepoint so a failing update cannot roll back the
+        outcomes recorded for the other rows of the batch.
+        """
+        try:
+            with self.env.cr.savepoint():
+                getattr(self.notification_id, method)(*args)
+        except Exception:
+            _logger.exception('WAHA outbox: could not update notification %s', self.notification_id.id)
+
+    def _record_failure(self, error):
+        """Schedule a retry with exponential backoff, or give up after MAX_ATTEMPTS"""
+        now = fields.Datetime.now()
+        for row in self:
+            attempts = row.attempts + 1
+            if attempts >= MAX_ATTEMPTS:
+                row.write({'state': 'failed', 'attempts': attempts, 'last_error': error})
+                if row.notification_id:
+                    row._update_notification('_mark_failed', error)
+            else:
+                row.write({
+                    'attempts': attempts,
+                    'last_error': error,
+                    'next_attempt_at': now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1)),
+                })
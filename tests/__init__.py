@@ -2,4 +2,4 @@
 
 from . import test_helpers
 from . import test_compatibility
-
+from . import test_batching
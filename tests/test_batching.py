@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for ShuttleBee batched processing and caching
+"""
+
+import io
+import json
+import threading
+import time
+import unittest
+from collections import Counter
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+from odoo import fields
+from odoo.tests import tagged, TransactionCase
+
+from odoo.addons.shuttlebee.helpers.rate_limiter import RateLimiter
+from odoo.addons.shuttlebee.helpers.route_optimizer_service import IJSON_AVAILABLE, RouteOptimizerService
+from odoo.addons.shuttlebee.helpers.waha_service import WAHAAPIError, WAHAConfig, WAHAService
+from odoo.addons.shuttlebee.models.shuttle_waha_outbox import MAX_ATTEMPTS, RETRY_BASE_SECONDS
+
+
+@tagged('shuttlebee', 'outbox', 'post_install', '-at_install')
+class TestWahaOutbox(TransactionCase):
+    """Test WAHA outbox ordering and retry backoff"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Outbox = cls.env['shuttle.waha.outbox']
+        cls.rows = cls.Outbox.browse()
+        for i in range(3):
+            cls.rows |= cls.Outbox.enqueue('/api/sendText', {
+                'session': 'default',
+                'chatId': '212600000000@c.us',
+                'text': f'Message {i}',
+            })
+
+    def _process(self, *outcomes):
+        """Run the outbox cron against a WAHA service returning the given outcomes"""
+        service = Mock()
+        service.post.side_effect = list(outcomes)
+        with patch.object(type(self.Outbox), '_get_service', return_value=service):
+            self.Outbox._cron_process_outbox()
+        return [call.args[1]['text'] for call in service.post.call_args_list]
+
+    def assertRetryAt(self, row, seconds):
+        self.assertAlmostEqual(
+            row.next_attempt_at,
+            fields.Datetime.now() + timedelta(seconds=seconds),
+            delta=timedelta(seconds=5)
+        )
+
+    def test_failure_holds_back_later_rows(self):
+        """A failed request stops its session's queue until it is retried"""
+        first, second, third = self.rows
+        sent = self._process({'id': 'msg-0'}, WAHAAPIError('Session not ready'))
+
+        self.assertEqual(sent, ['Message 0', 'Message 1'])
+        self.assertEqual(first.state, 'done')
+        self.assertEqual(second.state, 'pending')
+        self.assertEqual(second.attempts, 1)
+        self.assertEqual(second.last_error, 'Session not ready')
+        self.assertRetryAt(second, RETRY_BASE_SECONDS)
+        self.assertEqual(third.state, 'pending')
+        self.assertEqual(third.attempts, 0)
+
+        # Nothing is sent while the head of the queue waits for its retry
+        self.assertEqual(self._process(), [])
+
+        second.next_attempt_at = fields.Datetime.now() - timedelta(seconds=1)
+        sent = self._process({'id': 'msg-1'}, {'id': 'msg-2'})
+        self.assertEqual(sent, ['Message 1', 'Message 2'])
+        self.assertEqual(self.rows.mapped('state'), ['done', 'done', 'done'])
+        self.assertEqual(second.attempts, 2)
+        self.assertFalse(second.last_error)
+
+    def test_backoff_doubles_until_failed(self):
+        """Retries back off exponentially and give up after MAX_ATTEMPTS"""
+        row = self.rows[0]
+        row.attempts = 2
+        row._record_failure('Timeout')
+        self.assertEqual(row.attempts, 3)
+        self.assertEqual(row.state, 'pending')
+        self.assertRetryAt(row, RETRY_BASE_SECONDS * 4)
+
+        row.attempts = MAX_ATTEMPTS - 1
+        row._record_failure('Timeout')
+        self.assertEqual(row.attempts, MAX_ATTEMPTS)
+        self.assertEqual(row.state, 'failed')
+
+    def test_retry_does_not_resend_queued_notification(self):
+        """Retrying a notification waiting in the outbox does not queue it again"""
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('shuttlebee.whatsapp_provider_type', 'waha_whatsapp')
+        params.set_param('shuttlebee.whatsapp_api_url', 'https://waha.example.com')
+        params.set_param('shuttlebee.whatsapp_api_key', 'secret')
+        params.set_param('shuttlebee.waha_async_delivery', 'True')
+        passenger = self.env['res.partner'].create({'name': 'Outbox Passenger'})
+        notification = self.env['shuttle.notification'].create({
+            'passenger_id': passenger.id,
+            'notification_type': 'custom',
+            'channel': 'whatsapp',
+            'recipient_phone': '+212600000001',
+            'message_content': 'Queued message',
+        })
+
+        notification._send_notification()
+        self.assertEqual(notification.status, 'queued')
+        queued = self.Outbox.search([('notification_id', '=', notification.id)])
+        self.assertEqual(len(queued), 1)
+
+        notification.action_retry()
+        self.assertEqual(notification.status, 'queued')
+        self.assertEqual(self.Outbox.search_count([('notification_id', '=', notification.id)]), 1)
+
+        # Once the outbox gives up, the notification can be retried again
+        queued.attempts = MAX_ATTEMPTS - 1
+        queued._record_failure('Timeout')
+        self.assertEqual(notification.status, 'failed')
+        notification.action_retry()
+        self.assertEqual(notification.status, 'queued')
+        self.assertEqual(self.Outbox.search_count([('notification_id', '=', notification.id)]), 2)
+
+
+@tagged('shuttlebee', 'helpers', 'post_install', '-at_install')
+class TestTokenBucket(TransactionCase):
+    """Test the RateLimiter token bucket"""
+
+    def test_refill(self):
+        """Tokens accrue at max_requests / time_window up to the burst size"""
+        limiter = RateLimiter(max_requests=2, time_window=10)
+        now = time.monotonic()
+        self.assertTrue(limiter.try_acquire(now))
+        self.assertTrue(limiter.try_acquire(now))
+        self.assertFalse(limiter.try_acquire(now))
+        self.assertAlmostEqual(limiter.time_until_available(now), 5.0, places=6)
+
+        # Half a token after 2.5 s, a full one after 5 s
+        self.assertFalse(limiter.try_acquire(now + 2.5))
+        self.assertTrue(limiter.try_acquire(now + 6))
+        self.assertFalse(limiter.try_acquire(now + 6))
+
+        # A long idle period refills only up to the burst size
+        later = now + 1000
+        self.assertEqual(limiter.time_until_available(later), 0.0)
+        self.assertTrue(limiter.try_acquire(later))
+        self.assertTrue(limiter.try_acquire(later))
+        self.assertFalse(limiter.try_acquire(later))
+
+    def test_invalid_limits(self):
+        """Non-positive limits are rejected"""
+        with self.assertRaises(ValueError):
+            RateLimiter(max_requests=10, time_window=0)
+        with self.assertRaises(ValueError):
+            RateLimiter(max_requests=0, time_window=60)
+
+
+@tagged('shuttlebee', 'helpers', 'post_install', '-at_install')
+class TestRouteOptimizerService(TransactionCase):
+    """Test the Route Optimizer client without a remote solver"""
+
+    DEPOT = {'id': 'depot', 'name': 'Depot', 'lat': 35.7796, 'lng': -5.8137}
+    LOCATIONS = [{'id': 'p1', 'name': 'Passenger 1', 'lat': 35.7700, 'lng': -5.8000}]
+    VEHICLES = [{'id': 'v1', 'name': 'Bus 1', 'seats': 20}]
+
+    @staticmethod
+    def _response(data, status_code=200):
+        response = Mock(status_code=status_code, content=json.dumps(data).encode())
+        response.json.return_value = data
+        return response
+
+    def _optimize(self, service):
+        return service.optimize('PASSENGERS', self.DEPOT, self.LOCATIONS, self.VEHICLES)
+
+    def test_cache_disabled_by_default(self):
+        """Without a cache_size every call reaches the solver"""
+        service = RouteOptimizerService()
+        result = {'success': True, 'routes': []}
+        with patch.object(service._session, 'post', return_value=self._response(result)) as post:
+            self._optimize(service)
+            self._optimize(service)
+        self.assertEqual(post.call_count, 2)
+
+    def test_cache_hit_and_expiry(self):
+        """Identical problems are served from the cache until cache_ttl elapses"""
+        service = RouteOptimizerService(cache_size=8, cache_ttl=60)
+        result = {'success': True, 'routes': [{'vehicle_id': 'v1', 'stops': []}]}
+        with patch.object(service._session, 'post', return_value=self._response(result)) as post:
+            first = self._optimize(service)
+            first['routes'].clear()
+            second = self._optimize(service)
+            self.assertEqual(post.call_count, 1)
+            # Callers get their own copy of the cached result
+            self.assertEqual(second, result)
+
+            # Age the entry past its TTL
+            for key, (cached, stored_at) in list(service._cache.items()):
+                service._cache[key] = (cached, stored_at - 61)
+            self._optimize(service)
+            self.assertEqual(post.call_count, 2)
+
+    def test_batch_falls_back_without_batch_route(self):
+        """Servers without /batch get the problems as individual requests"""
+        problem = {
+            'mode': 'PASSENGERS',
+            'depot': self.DEPOT,
+            'locations': self.LOCATIONS,
+            'vehicles': self.VEHICLES,
+        }
+        result = {'success': True, 'routes': []}
+        for status_code in (404, 405):
+            service = RouteOptimizerService()
+
+            def post(url, **kwargs):
+                if url.endswith('/batch'):
+                    return self._response({'detail': 'Not Found'}, status_code)
+                return self._response(result)
+
+            with patch.object(service._session, 'post', side_effect=post) as mock_post:
+                results = service.optimize_batch([problem, problem, problem])
+            self.assertEqual(results, [result] * 3)
+            urls = [call.args[0] for call in mock_post.call_args_list]
+            self.assertEqual(urls, [service.api_url + '/batch'] + [service.api_url] * 3)
+
+    def test_post_is_not_retried(self):
+        """The HTTP adapter never repeats an optimization POST"""
+        service = RouteOptimizerService()
+        retry = service._session.get_adapter(service.api_url).max_retries
+        self.assertFalse(retry.is_retry('POST', 503))
+        self.assertTrue(retry.is_retry('GET', 503))
+
+    @unittest.skipUnless(IJSON_AVAILABLE, 'ijson is not installed')
+    def test_stream_keeps_summary_members(self):
+        """Streaming parses routes and keeps every other top-level member intact"""
+        result = {
+            'success': True,
+            'total_distance_km': 12.5,
+            'routes': [
+                {'vehicle_id': 'v1', 'stops': [{'order': 1, 'location_id': 'p1'}]},
+                {'vehicle_id': 'v2', 'stops': []},
+            ],
+            'unassigned': [{'id': 'p3', 'reason': 'capacity'}, 'p4'],
+            'stats': {'solver': {'ms': 3}},
+            'warnings': [],
+        }
+        summary = {}
+        stream = io.BytesIO(json.dumps(result).encode())
+        routes = list(RouteOptimizerService._iter_routes(stream, summary))
+
+        expected = dict(result)
+        self.assertEqual(routes, expected.pop('routes'))
+        self.assertEqual(summary, expected)
+
+
+@tagged('shuttlebee', 'helpers', 'post_install', '-at_install')
+class TestWahaServiceRetries(TransactionCase):
+    """Test the WAHA HTTP adapter retry policy"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = WAHAService(WAHAConfig(api_url='https://waha.example.com', api_key='secret'))
+        self.addCleanup(self.service.close)
+
+    def test_sends_are_not_retried(self):
+        """Message sends (POST) are never repeated by the adapter; reads are"""
+        retry = self.service._http.get_adapter(self.service.api_url).max_retries
+        for status in (429, 502, 503, 504):
+            self.assertFalse(retry.is_retry('POST', status))
+            self.assertTrue(retry.is_retry('GET', status))
+        self.assertFalse(retry.is_retry('GET', 500))
+
+    def test_send_error_surfaces_after_one_request(self):
+        """A 503 on sendText is reported after a single request, a 503 on a read is retried"""
+        requests_seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                requests_seen.append(self.command)
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.addCleanup(server.server_close)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.shutdown)
+        service = WAHAService(WAHAConfig(
+            api_url=f'http://127.0.0.1:{server.server_port}',
+            api_key='secret',
+        ))
+        self.addCleanup(service.close)
+
+        with patch('time.sleep'), self.assertRaises(WAHAAPIError):
+            service.post('/api/sendText', {'session': 'default', 'chatId': '1@c.us', 'text': 'Hi'})
+        self.assertEqual(requests_seen, ['POST'])
+
+        with patch('time.sleep'), self.assertRaises(WAHAAPIError):
+            service._make_request('GET', '/api/sessions')
+        self.assertEqual(requests_seen, ['POST'] + ['GET'] * 4)
+
+
+@tagged('shuttlebee', 'settings', 'post_install', '-at_install')
+class TestSettingsParams(TransactionCase):
+    """Test the ShuttleBee settings parameter upsert"""
+
+    def setUp(self):
+        super().setUp()
+        self.Param = self.env['ir.config_parameter'].sudo()
+        self.company_key = f'.company_{self.env.company.id}'
+
+    def _save(self, **values):
+        """Open the settings form, change the given fields and save"""
+        self.env['res.config.settings'].create(values).execute()
+
+    def _load(self):
+        return self.env['res.config.settings'].create({})
+
+    def test_round_trip(self):
+        """Saved values are stored globally and per company, and load back"""
+        self._save(shuttlebee_approaching_minutes=7, shuttlebee_sms_api_url='https://sms.example.com')
+
+        for key in ('shuttlebee.approaching_minutes', 'shuttlebee.approaching_minutes' + self.company_key):
+            self.assertEqual(self.Param.get_param(key), '7')
+        settings = self._load()
+        self.assertEqual(settings.shuttlebee_approaching_minutes, 7)
+        self.assertEqual(settings.shuttlebee_sms_api_url, 'https://sms.example.com')
+
+        # Saving again updates the existing rows in place
+        self._save(shuttlebee_approaching_minutes=12)
+        self.assertEqual(self._load().shuttlebee_approaching_minutes, 12)
+        self.assertEqual(self.Param.search_count([('key', '=', 'shuttlebee.approaching_minutes')]), 1)
+
+    def test_provider_switch_keeps_waha_settings(self):
+        """Switching away from WAHA and back does not reset the WAHA settings"""
+        self._save(
+            shuttlebee_whatsapp_provider_type='waha_whatsapp',
+            shuttlebee_whatsapp_api_url='https://waha.example.com',
+            shuttlebee_whatsapp_api_key='secret',
+            shuttlebee_waha_session='school',
+        )
+
+        self._save(shuttlebee_whatsapp_provider_type='whatsapp_business')
+        settings = self._load()
+        self.assertEqual(settings.shuttlebee_whatsapp_provider_type, 'whatsapp_business')
+        self.assertEqual(settings.shuttlebee_waha_session, 'school')
+
+        self._save(shuttlebee_whatsapp_provider_type='waha_whatsapp')
+        for key in ('shuttlebee.waha_session', 'shuttlebee.waha_session' + self.company_key):
+            self.assertEqual(self.Param.get_param(key), 'school')
+        settings = self._load()
+        self.assertEqual(settings.shuttlebee_whatsapp_provider_type, 'waha_whatsapp')
+        self.assertEqual(settings.shuttlebee_whatsapp_api_url, 'https://waha.example.com')
+        self.assertEqual(settings.shuttlebee_whatsapp_api_key, 'secret')
+
+
+@tagged('shuttlebee', 'post_install', '-at_install')
+class TestGpsPositionPurge(TransactionCase):
+    """Test the GPS position retention purge"""
+
+    def test_purge_respects_cutoff_and_batches(self):
+        """Only finished trips past the retention window are purged, in batches"""
+        self.env['ir.config_parameter'].sudo().set_param('shuttlebee.gps_retention_days', 30)
+        driver = self.env['res.users'].create({
+            'name': 'Purge Driver',
+            'login': 'shuttlebee_purge_driver',
+        })
+        today = fields.Date.context_today(self.env['shuttle.gps.position'])
+        now = fields.Datetime.now()
+        trips = self.env['shuttle.trip'].create([{
+            'name': f'Purge Trip {i}',
+            'driver_id': driver.id,
+            'date': today - timedelta(days=days),
+            'planned_start_time': now - timedelta(days=days),
+        } for i, days in enumerate((60, 60, 10))])
+        old_done, old_open, recent_done = trips
+        (old_done | recent_done).write({'state': 'done'})
+
+        Position = self.env['shuttle.gps.position']
+        positions = {
+            trip: Position.create([
+                {'trip_id': trip.id, 'latitude': 35.7796, 'longitude': -5.8137}
+                for _i in range(3)
+            ])
+            for trip in trips
+        }
+
+        def purge():
+            with patch.object(type(self.env['ir.cron']), '_notify_progress') as notify:
+                Position._cron_purge_old_positions(batch_size=2)
+            return notify.call_args.kwargs
+
+        # A full batch asks the cron to run again
+        self.assertEqual(purge(), {'done': 2, 'remaining': 1})
+        self.assertEqual(len(positions[old_done].exists()), 1)
+        self.assertEqual(purge(), {'done': 1, 'remaining': 0})
+        self.assertFalse(positions[old_done].exists())
+        self.assertEqual(Position.search_count([('trip_id', '=', old_done.id)]), 0)
+
+        # Open trips and trips inside the retention window keep their history
+        self.assertEqual(len(positions[old_open].exists()), 3)
+        self.assertEqual(len(positions[recent_done].exists()), 3)
+
+
+@tagged('shuttlebee', 'post_install', '-at_install')
+class TestPassengerTripStats(TransactionCase):
+    """Test the grouped passenger trip statistics"""
+
+    def test_grouped_counts_match_lines(self):
+        """Stats computed with one GROUP BY match counting the lines one by one"""
+        driver = self.env['res.users'].create({
+            'name': 'Stats Driver',
+            'login': 'shuttlebee_stats_driver',
+        })
+        passengers = self.env['res.partner'].create([
+            {'name': f'Stats Passenger {i}', 'is_shuttle_passenger': True}
+            for i in range(3)
+        ])
+        statuses = ['boarded', 'dropped', 'absent', 'planned', 'boarded', 'notified_arrived']
+        start = fields.Datetime.now()
+        trips = self.env['shuttle.trip'].create([{
+            'name': f'Stats Trip {i}',
+            'driver_id': driver.id,
+            'date': (start + timedelta(days=i)).date(),
+            'planned_start_time': start + timedelta(days=i),
+        } for i in range(len(statuses))])
+
+        location = {'pickup_latitude': 35.7796, 'pickup_longitude': -5.8137}
+        lines = self.env['shuttle.trip.line'].create(
+            [dict(location, trip_id=trip.id, passenger_id=passengers[0].id, status=status)
+             for trip, status in zip(trips, statuses)]
+            + [dict(location, trip_id=trips[0].id, passenger_id=passengers[1].id, status='absent')]
+        )
+
+        def check():
+            for passenger in passengers:
+                counts = Counter(passenger.shuttle_trip_line_ids.mapped('status'))
+                total = sum(counts.values())
+                present = counts['boarded'] + counts['dropped']
+                self.assertEqual(passenger.total_trips, total)
+                self.assertEqual(passenger.present_trips, present)
+                self.assertEqual(passenger.absent_trips, counts['absent'])
+                self.assertAlmostEqual(passenger.attendance_rate, present / total * 100 if total else 0.0)
+
+        check()
+        self.assertEqual(passengers[0].total_trips, 6)
+        self.assertEqual(passengers[0].present_trips, 3)
+        self.assertEqual(passengers[2].total_trips, 0)
+
+        # Status changes are picked up by the stored compute
+        lines[3].status = 'absent'
+        lines[-1].status = 'boarded'
+        check()
+        self.assertEqual(passengers[0].absent_trips, 2)
+        self.assertEqual(passengers[1].present_trips, 1)
@@ -123,6 +123,23 @@ class TestRetryUtils(unittest.TestCase):
         self.assertEqual(call_count[0], 2)
         self.assertEqual(mock_sleep.call_count, 1)
 
+    @patch('time.sleep')
+    def test_retry_decorator_single_exception_class(self, mock_sleep):
+        """Test retry_on and ignore_on given as a single exception class"""
+        call_count = [0]
+        
+        @retry_with_backoff(max_retries=3, retry_on=ConnectionError, ignore_on=ValueError)
+        def flaky_function():
+            call_count[0] += 1
+            if call_count[0] < 2:
+                raise ConnectionError("Temporary failure")
+            raise ValueError("Bad input")
+        
+        with self.assertRaises(ValueError):
+            flaky_function()
+        self.assertEqual(call_count[0], 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
 
 @tagged('shuttlebee', 'helpers', 'post_install')
 class TestNotificationProviders(unittest.TestCase):
@@ -4,9 +4,22 @@ WAHA QR Code Wizard
 Displays the QR code for WhatsApp authentication via WAHA
 """
 
+import time
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
+from ..helpers.waha_service import get_shared_waha_service
+
+# Labels shown for WAHA session statuses
+SESSION_STATUS_LABELS = {
+    'WORKING': '✅ متصل ويعمل',
+    'STOPPED': '⏹️ متوقف',
+    'STARTING': '🔄 يبدأ...',
+    'SCAN_QR_CODE': '📱 يحتاج مسح QR Code',
+    'FAILED': '❌ فشل الاتصال',
+}
+
 
 class ShuttleWahaQrWizard(models.TransientModel):
     _name = 'shuttle.waha.qr.wizard'
@@ -44,25 +57,11 @@ class ShuttleWahaQrWizard(models.TransientModel):
                     record.session_status = '❌ WAHA غير مُهيأ'
                     continue
                 
-                from ..helpers.waha_service import create_waha_service, WAHAAPIError
-                
-                service = create_waha_service(
-                    api_url=api_url,
-                    api_key=api_key,
-                    session=session
-                )
+                service = get_shared_waha_service(api_url, api_key, session)
                 
                 session_info = service.get_session()
                 status = session_info.get('status') or session_info.get('engine', {}).get('status', 'UNKNOWN')
-                
-                status_map = {
-                    'WORKING': '✅ متصل ويعمل',
-                    'STOPPED': '⏹️ متوقف',
-                    'STARTING': '🔄 يبدأ...',
-                    'SCAN_QR_CODE': '📱 يحتاج مسح QR Code',
-                    'FAILED': '❌ فشل الاتصال',
-                }
-                record.session_status = status_map.get(status, f'❓ {status}')
+                record.session_status = SESSION_STATUS_LABELS.get(status, f'❓ {status}')
                 
             except Exception as e:
                 record.session_status = f'❌ خطأ: {str(e)[:30]}'
@@ -97,7 +96,6 @@ class ShuttleWahaQrWizard(models.TransientModel):
             session = params.get_param('shuttlebee.waha_session', 'default')
             
             # Update the QR URL with timestamp to prevent caching
-            import time
             self.qr_code_url = f"{api_url}/api/{session}/auth/qr?format=image&t={int(time.time())}"
             
             return {